@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -70,6 +71,8 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # A file rather than in-memory, since the analysis pipeline writes from its own threads
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
     }
 }
 
@@ -106,3 +109,69 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # ✅ Keep cookies unsecured for localhost (optional in development)
 CSRF_COOKIE_SECURE = False
 SESSION_COOKIE_SECURE = False
+
+# Tweet analysis
+ANALYZER_BATCH_SIZE = 32  # Tweets per model forward pass
+ANALYZER_WARMUP = os.getenv("ANALYZER_WARMUP", "False").lower() == "true"  # Load models in the background when a server starts
+ANALYZER_INTRA_OP_THREADS = None  # Torch intra-op threads for the whole process, shared by all models; None keeps torch's default
+# Merge concurrent requests' texts into shared forward passes of up to ANALYZER_BATCH_SIZE tweets
+ANALYZER_MICROBATCH_ENABLED = False
+ANALYZER_MICROBATCH_MAX_WAIT_MS = 5  # How long the dispatcher waits to fill a batch
+# Send inference to a shared pool started with `manage.py run_inference_pool`, e.g. "/tmp/analytica-inference.sock" or "127.0.0.1:8765"
+ANALYZER_WORKER_POOL_ADDRESS = os.getenv("ANALYZER_WORKER_POOL_ADDRESS")
+ANALYZER_WORKER_POOL_SIZE = None  # Forked workers; None uses one per core
+ANALYZER_WORKER_POOL_TIMEOUT = 120  # Seconds a request waits for the pool before failing
+# Inference backend per analyzer: "fp32", "int8" (dynamic quantization) or "traced" (TorchScript)
+ANALYZER_BACKENDS = {
+    "sentiment": "fp32",
+    "toxicity": "fp32",
+    "emotion": "fp32",
+}
+
+# Analysis result cache: an in-process LRU in front of a persistent SQLite file
+ANALYSIS_CACHE_ENABLED = True
+ANALYSIS_CACHE_SIZE = 10000  # Entries kept in memory per process
+ANALYSIS_CACHE_PATH = BASE_DIR / 'analysis_cache.sqlite3'  # None disables the disk tier
+ANALYSIS_CACHE_DISK_SIZE = 1000000  # Rows kept on disk; the oldest are deleted beyond this
+
+# Translation of non-English tweets
+TRANSLATION_BACKEND = os.getenv("TRANSLATION_BACKEND", "google")  # "google", "http", or "local" for an offline stand-in
+TRANSLATION_CACHE_SIZE = 10000  # Translations kept in memory per process
+TRANSLATION_API_URL = os.getenv("TRANSLATION_API_URL", "http://localhost:5000")  # LibreTranslate-compatible API for the "http" backend
+TRANSLATION_API_KEY = os.getenv("TRANSLATION_API_KEY")
+TRANSLATION_CONCURRENCY = 8  # Translation requests in flight at once
+TRANSLATION_RATE_LIMIT = 10  # Requests per second; None disables rate limiting
+TRANSLATION_MAX_RETRIES = 3
+
+# Browser sessions used for scraping
+SCRAPER_BACKEND = os.getenv("SCRAPER_BACKEND", "selenium")  # "selenium", or "replay" to serve recorded scrapes offline
+SCRAPER_RECORD_DIR = os.getenv("SCRAPER_RECORD_DIR")  # Save every live scrape here for replay; None disables recording
+SCRAPER_RECORD_SNAPSHOTS = False  # Also save the page HTML after each scroll while recording
+SCRAPER_REPLAY_DIR = BASE_DIR / 'twitter_app' / 'data' / 'recordings'
+SCRAPER_REPLAY_LATENCY = None  # Seconds per replayed scroll; None replays the recorded timings
+SCRAPER_POOL_SIZE = 2  # Logged-in sessions, i.e. scrapes that can run in parallel
+SCRAPER_MAX_SESSION_AGE = 3600  # Seconds before a session is replaced; None keeps sessions until they fail
+SCRAPER_CHECKOUT_TIMEOUT = 120  # Seconds a request waits for a free session before giving up
+# Saved login cookies; set SCRAPER_COOKIE_PATH to an empty value to log in every time instead
+SCRAPER_COOKIE_PATH = os.getenv("SCRAPER_COOKIE_PATH", str(BASE_DIR / 'twitter_session.json')) or None
+# Don't load images, autoplaying media or web fonts in the scraper browsers. Opt-in: the PAC host blocking it
+# relies on hasn't been checked against a real Firefox yet, so compare a scrape's log with and without it first
+SCRAPER_LEAN_PROFILE = os.getenv("SCRAPER_LEAN_PROFILE", "False").lower() == "true"
+SCRAPER_BLOCKED_HOSTS = None  # Media and analytics hosts the lean profile blocks; None uses the scraper's defaults, [] blocks none
+SCRAPE_QUEUE_SIZE = 8  # Scrolls' worth of tweets buffered ahead of analysis
+SCRAPE_CACHE_TTL = 600  # Seconds a username/hashtag search is answered from the database instead of scraping; 0 disables
+SCRAPE_TARGET_HISTORY = 500  # Recent tweet ids remembered per username/hashtag to stop scrapes early
+
+# Staged analysis pipeline (scrape -> detect -> translate -> analyze -> persist)
+PIPELINE_QUEUE_SIZE = 4  # Batches buffered between two stages before the earlier stage waits
+PIPELINE_STAGE_WORKERS = {  # Threads per stage
+    "detect": 1,
+    "translate": 2,
+    "analyze": 1,
+    "persist": 1,
+}
+
+# Background analysis jobs (POST /api/jobs/)
+ANALYSIS_JOB_WORKERS = 2  # Jobs analysed at once; further jobs wait in the queue
+ANALYSIS_JOB_PROGRESS_INTERVAL = 1.0  # Seconds between progress updates saved for a running job
+ANALYSIS_JOB_HEARTBEAT_INTERVAL = 30  # Seconds between heartbeats; jobs silent for 3 intervals are marked failed
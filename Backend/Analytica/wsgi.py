@@ -14,3 +14,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Analytica.settings')
 
 application = get_wsgi_application()
+
+from twitter_app.apps import start_warm_up  # noqa: E402 (needs the apps loaded above)
+
+start_warm_up()
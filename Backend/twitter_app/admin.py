@@ -1,6 +1,8 @@
 from django.contrib import admin
-from .models import User, Tweet, userSearchHistory
+from .models import User, Tweet, userSearchHistory, ScrapeTarget, AnalysisJob
 
 admin.site.register(User)
 admin.site.register(Tweet)
 admin.site.register(userSearchHistory)
+admin.site.register(ScrapeTarget)
+admin.site.register(AnalysisJob)
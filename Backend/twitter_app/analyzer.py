@@ -1,9 +1,33 @@
 import joblib
 import pickle
-from .models import Tweet  # Still imported for reference elsewhere
+import hashlib
+import json
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from .models import Tweet, ANALYSIS_LABELS, scores_to_label
 from transformers import AutoModelForSequenceClassification, AutoTokenizer
-import numpy as np
+import torch
 from scipy.special import softmax
+from django.conf import settings
+from .cache import AnalysisCache
+from .backends import DEFAULT_BACKEND, create_backend, get_backend_name
+from .workers import PoolAnalyzer, get_pool_address
+
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_MAX_WAIT_MS = 5
+SCHEDULER_SORT_WINDOW = 4  # Batches' worth of queued texts sorted together when there is a backlog
+MAX_SEQUENCE_LENGTH = 512
+COMBINED_ANALYSIS_TYPES = ["sentiment", "toxicity", "emotion"]
+WARM_UP_TEXTS = [
+    "Warming up the model",
+    "@user a slightly longer tweet so the warm-up batch needs padding http",
+]
+
+logger = logging.getLogger(__name__)
+_scheduler_lock = threading.Lock()
 
 def preprocess(text):
     new_text = []
@@ -13,25 +37,228 @@ def preprocess(text):
         new_text.append(t)
     return " ".join(new_text)
 
+def get_batch_size():
+    return getattr(settings, 'ANALYZER_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+
+def microbatching_enabled():
+    return getattr(settings, 'ANALYZER_MICROBATCH_ENABLED', False)
+
+def configure_torch_threads():
+    """Apply ANALYZER_INTRA_OP_THREADS, which sets torch's thread count for the whole process."""
+    threads = getattr(settings, 'ANALYZER_INTRA_OP_THREADS', None)
+    if threads and torch.get_num_threads() != threads:
+        torch.set_num_threads(threads)
+
+def length_sorted_batches(contents, batch_size):
+    """Yield index chunks of similar text length so each batch pads to a similar size."""
+    order = sorted(range(len(contents)), key=lambda i: len(contents[i]))
+    for start in range(0, len(order), batch_size):
+        yield order[start:start + batch_size]
+
+class InferenceScheduler:
+    """Merges texts submitted by concurrent callers into shared forward passes of one analyzer.
+
+    A dispatcher thread waits for the first queued text, keeps collecting until the batch is
+    full or max_wait_ms has passed, sorts what it has by token length and resolves each
+    caller's future once the forward pass returns.
+    """
+
+    def __init__(self, analyzer, max_batch_size=None, max_wait_ms=None):
+        self.analyzer = analyzer
+        self.max_batch_size = max_batch_size or get_batch_size()
+        if max_wait_ms is None:
+            max_wait_ms = getattr(settings, 'ANALYZER_MICROBATCH_MAX_WAIT_MS', DEFAULT_MAX_WAIT_MS)
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"{analyzer.name.lower()}-scheduler",
+            daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, contents):
+        """Queue preprocessed contents, returning one Future per content."""
+        futures = []
+        for content in contents:
+            future = Future()
+            self._queue.put((content, future))
+            futures.append(future)
+        return futures
+
+    def _run(self):
+        while True:
+            pending = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(pending) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    pending.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            # Under load, also take whatever is already queued so sorting can group similar lengths
+            while len(pending) < self.max_batch_size * SCHEDULER_SORT_WINDOW:
+                try:
+                    pending.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._dispatch([item for item in pending if item[1].set_running_or_notify_cancel()])
+
+    def _dispatch(self, pending):
+        if not pending:
+            return
+        contents = [content for content, _ in pending]
+        try:
+            # Tokenize once without padding; each chunk is padded to its own longest text below
+            features = self.analyzer.tokenize(contents)
+        except Exception as e:
+            logger.error(f"Error tokenizing for {self.analyzer.name.lower()}: {e}")
+            for _, future in pending:
+                future.set_result(None)
+            return
+        order = sorted(range(len(pending)), key=lambda i: len(features['input_ids'][i]))
+        for start in range(0, len(order), self.max_batch_size):
+            chunk = order[start:start + self.max_batch_size]
+            try:
+                scores = self.analyzer.predict(self.analyzer.pad(features, chunk))
+            except Exception as e:
+                logger.error(f"Error analyzing {self.analyzer.name.lower()}: {e}")
+                scores = [None] * len(chunk)
+            for i, item_scores in zip(chunk, scores):
+                pending[i][1].set_result(item_scores)
+
 class BaseAnalyzer:
+    name = "Base"
+    model_name = None
+    labels = []
+
     def analyze(self, text):
-        raise NotImplementedError("Subclasses must implement this method")
+        return self.analyze_batch([text])[0]
+
+    def analyze_batch(self, texts, batch_size=None):
+        """Analyze a list of texts, returning one label per text in input order."""
+        return [self.label_for(scores) for scores in self.score_batch(texts, batch_size=batch_size)]
+
+    def score_batch(self, texts, batch_size=None):
+        """Return the class-probability vector (ordered like self.labels) for each text."""
+        self._check_ready()
+        if not texts:
+            return []
+        contents = [preprocess(text) for text in texts]
+        if microbatching_enabled():
+            return [future.result() for future in self.scheduler.submit(contents)]
+        batch_size = batch_size or get_batch_size()
+        results = [None] * len(contents)
+        for chunk in length_sorted_batches(contents, batch_size):
+            try:
+                scores = self.predict(self.encode([contents[i] for i in chunk]))
+            except Exception as e:
+                logger.error(f"Error analyzing {self.name.lower()}: {e}")
+                continue
+            for i, item_scores in zip(chunk, scores):
+                results[i] = item_scores
+        return results
+
+    def label_for(self, scores):
+        return scores_to_label(self.name.lower(), scores)
+
+    @classmethod
+    def from_components(cls, model, tokenizer, backend_name=DEFAULT_BACKEND):
+        """Build an analyzer around an already-loaded model and tokenizer, bypassing the singleton."""
+        analyzer = cls.__new__(cls)
+        analyzer.model = model
+        analyzer.tokenizer = tokenizer
+        analyzer.backend = create_backend(backend_name, model)
+        analyzer._initialized = True
+        return analyzer
+
+    def encode(self, contents):
+        return self.tokenizer(
+            contents,
+            padding=True,
+            truncation=True,
+            max_length=MAX_SEQUENCE_LENGTH,
+            return_tensors='pt'
+        )
+
+    def tokenize(self, contents):
+        """Token ids without padding, for callers that batch by token length before padding."""
+        return self.tokenizer(contents, truncation=True, max_length=MAX_SEQUENCE_LENGTH)
+
+    def pad(self, features, indices):
+        """Right-pad the tokenized texts at the given indices into one batch of tensors, as encode() would."""
+        length = max(len(features['input_ids'][i]) for i in indices)
+        batch = {}
+        for key, values in features.items():
+            fill = self.tokenizer.pad_token_id if key == 'input_ids' else 0
+            tensor = torch.full((len(indices), length), fill, dtype=torch.long)
+            for row, i in enumerate(indices):
+                tensor[row, :len(values[i])] = torch.tensor(values[i], dtype=torch.long)
+            batch[key] = tensor
+        return batch
+
+    def predict(self, encoded_input):
+        logits = self.backend(encoded_input)
+        return softmax(logits.numpy(), axis=1).tolist()
+
+    @property
+    def tokenizer_key(self):
+        """Fingerprint of the tokenizer vocabulary, shared by analyzers that tokenize identically."""
+        if getattr(self, '_tokenizer_key', None) is None:
+            vocab = sorted(self.tokenizer.get_vocab().items())
+            fingerprint = hashlib.sha1(json.dumps(vocab).encode('utf-8')).hexdigest()
+            self._tokenizer_key = (type(self.tokenizer).__name__, MAX_SEQUENCE_LENGTH, fingerprint)
+        return self._tokenizer_key
+
+    @property
+    def revision(self):
+        """Hub commit and inference backend, so cached results are invalidated when either changes."""
+        revision = getattr(self.model.config, '_commit_hash', None) or 'main'
+        if self.backend.name != DEFAULT_BACKEND:
+            revision = f"{revision}+{self.backend.name}"
+        return revision
+
+    @property
+    def scheduler(self):
+        """Shared micro-batching scheduler, started on first use."""
+        if getattr(self, '_scheduler', None) is None:
+            with _scheduler_lock:
+                if getattr(self, '_scheduler', None) is None:
+                    self._scheduler = InferenceScheduler(self)
+        return self._scheduler
+
+    def is_ready(self):
+        return self.model is not None and self.tokenizer is not None
+
+    def _check_ready(self):
+        if not self.is_ready():
+            raise RuntimeError(f"{self.name} model or tokenizer not initialized.")
 
 class SingletonMeta(type):
     _instances = {}
-    
+    _lock = threading.Lock()
+
     def __call__(cls, *args, **kwargs):
         if cls not in cls._instances:
-            cls._instances[cls] = super().__call__(*args, **kwargs)
+            with cls._lock:
+                # Re-check under the lock so concurrent first callers load the model only once
+                if cls not in cls._instances:
+                    cls._instances[cls] = super().__call__(*args, **kwargs)
         return cls._instances[cls]
 
 class SentimentAnalyzer(BaseAnalyzer, metaclass=SingletonMeta):
+    name = "Sentiment"
+    model_name = "cardiffnlp/twitter-roberta-base-sentiment"
+    labels = ANALYSIS_LABELS["sentiment"]
+
     def __init__(self):
         if not hasattr(self, '_initialized'):
             try:
-                self.model = AutoModelForSequenceClassification.from_pretrained("cardiffnlp/twitter-roberta-base-sentiment")
-                self.tokenizer = AutoTokenizer.from_pretrained("cardiffnlp/twitter-roberta-base-sentiment")
-                self.labels = ["Negative", "Neutral", "Positive"]
+                self.model = AutoModelForSequenceClassification.from_pretrained(self.model_name)
+                self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+                self.backend = create_backend(get_backend_name(self.name.lower()), self.model)
                 self._initialized = True
             except Exception as e:
                 print(f"Error loading sentiment model or tokenizer: {e}")
@@ -39,28 +266,17 @@ class SentimentAnalyzer(BaseAnalyzer, metaclass=SingletonMeta):
                 self.tokenizer = None
                 self._initialized = False
 
-    def analyze(self, text):
-        if self.model is None or self.tokenizer is None:
-            raise RuntimeError("Sentiment model or tokenizer not initialized.")
-        content = preprocess(text)
-        encoded_input = self.tokenizer(content, return_tensors='pt')
-        try:
-            output = self.model(**encoded_input)
-            scores = output[0][0].detach().numpy()
-            scores = softmax(scores)
-            sentiment = self.labels[np.argmax(scores)]
-            return sentiment
-        except Exception as e:
-            print(f"Error analyzing sentiment: {e}")
-            return None
-
 class ToxicityAnalyzer(BaseAnalyzer, metaclass=SingletonMeta):
+    name = "Toxicity"
+    model_name = "cardiffnlp/twitter-roberta-base-offensive"
+    labels = ANALYSIS_LABELS["toxicity"]
+
     def __init__(self):
         if not hasattr(self, '_initialized'):
             try:
-                self.model = AutoModelForSequenceClassification.from_pretrained("cardiffnlp/twitter-roberta-base-offensive")
-                self.tokenizer = AutoTokenizer.from_pretrained("cardiffnlp/twitter-roberta-base-offensive")
-                self.labels = ["not-offensive", "offensive"]
+                self.model = AutoModelForSequenceClassification.from_pretrained(self.model_name)
+                self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+                self.backend = create_backend(get_backend_name(self.name.lower()), self.model)
                 self._initialized = True
             except Exception as e:
                 print(f"Error loading offensive model or tokenizer: {e}")
@@ -68,28 +284,17 @@ class ToxicityAnalyzer(BaseAnalyzer, metaclass=SingletonMeta):
                 self.tokenizer = None
                 self._initialized = False
 
-    def analyze(self, text):
-        if self.model is None or self.tokenizer is None:
-            raise RuntimeError("Toxicity model or tokenizer not initialized.")
-        content = preprocess(text)
-        encoded_input = self.tokenizer(content, return_tensors='pt')
-        try:
-            output = self.model(**encoded_input)
-            scores = output[0][0].detach().numpy()
-            scores = softmax(scores)
-            toxicity = self.labels[np.argmax(scores)]
-            return toxicity
-        except Exception as e:
-            print(f"Error analyzing toxicity: {e}")
-            return None
-
 class EmotionAnalyzer(BaseAnalyzer, metaclass=SingletonMeta):
+    name = "Emotion"
+    model_name = "cardiffnlp/twitter-roberta-base-emotion"
+    labels = ANALYSIS_LABELS["emotion"]
+
     def __init__(self):
         if not hasattr(self, '_initialized'):
             try:
-                self.model = AutoModelForSequenceClassification.from_pretrained("cardiffnlp/twitter-roberta-base-emotion")
-                self.tokenizer = AutoTokenizer.from_pretrained("cardiffnlp/twitter-roberta-base-emotion")
-                self.labels = ["anger", "joy", "optimism", "sadness"]
+                self.model = AutoModelForSequenceClassification.from_pretrained(self.model_name)
+                self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+                self.backend = create_backend(get_backend_name(self.name.lower()), self.model)
                 self._initialized = True
             except Exception as e:
                 print(f"Error loading emotion model or tokenizer: {e}")
@@ -97,34 +302,268 @@ class EmotionAnalyzer(BaseAnalyzer, metaclass=SingletonMeta):
                 self.tokenizer = None
                 self._initialized = False
 
+class CachedAnalyzer:
+    """Wraps an analyzer so repeated content is served from the analysis cache instead of the model."""
+
+    def __init__(self, analyzer, cache):
+        self.analyzer = analyzer
+        self.cache = cache
+
+    def __getattr__(self, name):
+        return getattr(self.analyzer, name)
+
     def analyze(self, text):
-        if self.model is None or self.tokenizer is None:
-            raise RuntimeError("Emotion model or tokenizer not initialized.")
-        content = preprocess(text)
-        encoded_input = self.tokenizer(content, return_tensors='pt')
-        try:
-            output = self.model(**encoded_input)
-            scores = output[0][0].detach().numpy()
-            scores = softmax(scores)
-            emotion = self.labels[np.argmax(scores)]
-            return emotion
-        except Exception as e:
-            print(f"Error analyzing emotion: {e}")
-            return None
+        return self.analyze_batch([text])[0]
+
+    def analyze_batch(self, texts, batch_size=None):
+        return [self.analyzer.label_for(scores) for scores in self.score_batch(texts, batch_size=batch_size)]
+
+    def score_batch(self, texts, batch_size=None):
+        self.analyzer._check_ready()
+        contents = [preprocess(text) for text in texts]
+        results = self.lookup(contents)
+        # Score each distinct missing text once, however many times it was retweeted or copied
+        missing = list(dict.fromkeys(content for content, result in zip(contents, results) if result is None))
+        if missing:
+            fresh = dict(zip(missing, self.analyzer.score_batch(missing, batch_size=batch_size)))
+            self.store(fresh)
+            results = [fresh[content] if result is None else result for content, result in zip(contents, results)]
+        return results
+
+    def lookup(self, contents):
+        """Return the cached result for each preprocessed content, or None on a miss."""
+        keys = [self._key(content) for content in contents]
+        found = self.cache.get_many(keys)
+        return [found.get(key) for key in keys]
+
+    def store(self, results):
+        """Cache a {preprocessed content: result} mapping."""
+        self.cache.set_many({self._key(content): result for content, result in results.items()})
+
+    def _key(self, content):
+        return AnalysisCache.make_key(self.analyzer.model_name, self.analyzer.revision, content)
 
 class AnalyzerFactory:
-    _analyzers = {
-        'sentiment': SentimentAnalyzer(),
-        'toxicity': ToxicityAnalyzer(),
-        'emotion': EmotionAnalyzer()
+    """Creates analyzers on first use so importing this module never loads a model."""
+    _analyzer_classes = {
+        'sentiment': SentimentAnalyzer,
+        'toxicity': ToxicityAnalyzer,
+        'emotion': EmotionAnalyzer
     }
+    _analyzers = {}
+    _warmed_up = set()
+    _cache = None
+    _worker_pool_disabled = False
+    _lock = threading.Lock()
 
     @staticmethod
     def get_analyzer(analysis_type):
-        if analysis_type not in AnalyzerFactory._analyzers:
+        if analysis_type not in AnalyzerFactory._analyzer_classes:
+            raise ValueError(f"Unknown analysis type: {analysis_type}")
+        analyzer = AnalyzerFactory._analyzers.get(analysis_type)
+        if analyzer is None:
+            if AnalyzerFactory.worker_pool_enabled():
+                model = PoolAnalyzer(analysis_type)
+            else:
+                configure_torch_threads()
+                model = AnalyzerFactory._analyzer_classes[analysis_type]()
+            cache = AnalyzerFactory.get_cache()
+            with AnalyzerFactory._lock:
+                analyzer = AnalyzerFactory._analyzers.get(analysis_type)
+                if analyzer is None:
+                    analyzer = CachedAnalyzer(model, cache) if cache is not None else model
+                    AnalyzerFactory._analyzers[analysis_type] = analyzer
+        return analyzer
+
+    @staticmethod
+    def register(analysis_type, analyzer):
+        """Serve analysis_type from the given analyzer as-is, e.g. a locally built model in benchmarks."""
+        if analysis_type not in AnalyzerFactory._analyzer_classes:
             raise ValueError(f"Unknown analysis type: {analysis_type}")
-        return AnalyzerFactory._analyzers[analysis_type]
+        with AnalyzerFactory._lock:
+            AnalyzerFactory._analyzers[analysis_type] = analyzer
+
+    @staticmethod
+    def get_cache():
+        with AnalyzerFactory._lock:
+            if AnalyzerFactory._cache is None and getattr(settings, 'ANALYSIS_CACHE_ENABLED', True):
+                AnalyzerFactory._cache = AnalysisCache.from_settings()
+            return AnalyzerFactory._cache
+
+    @staticmethod
+    def worker_pool_enabled():
+        return not AnalyzerFactory._worker_pool_disabled and get_pool_address() is not None
+
+    @staticmethod
+    def disable_worker_pool():
+        """Load models in this process even if a worker pool address is configured (used by the pool itself)."""
+        AnalyzerFactory._worker_pool_disabled = True
+
+    @staticmethod
+    def is_loaded(analysis_type):
+        analyzer = AnalyzerFactory._analyzers.get(analysis_type)
+        return analyzer is not None and analyzer.is_ready()
+
+    @staticmethod
+    def status():
+        """Report which models are loaded and warmed up."""
+        return {
+            analysis_type: {
+                "loaded": AnalyzerFactory.is_loaded(analysis_type),
+                "warmed_up": analysis_type in AnalyzerFactory._warmed_up
+            }
+            for analysis_type in AnalyzerFactory._analyzer_classes
+        }
+
+    @staticmethod
+    def warm_up(analysis_types=None, background=True):
+        """Load the models and run a dummy batch through each so the first real request is fast."""
+        analysis_types = list(analysis_types or AnalyzerFactory._analyzer_classes)
+        if background:
+            thread = threading.Thread(
+                target=AnalyzerFactory.warm_up,
+                args=(analysis_types, False),
+                name="analyzer-warm-up",
+                daemon=True
+            )
+            thread.start()
+            return thread
+        for analysis_type in analysis_types:
+            try:
+                analyzer = AnalyzerFactory.get_analyzer(analysis_type)
+                # Bypass the result cache so the dummy batch always reaches the model
+                if isinstance(analyzer, CachedAnalyzer):
+                    analyzer = analyzer.analyzer
+                analyzer.analyze_batch(WARM_UP_TEXTS)
+                AnalyzerFactory._warmed_up.add(analysis_type)
+                logger.info(f"Warmed up {analysis_type} analyzer")
+            except Exception as e:
+                logger.error(f"Error warming up {analysis_type} analyzer: {e}")
+
+class CombinedAnalyzer:
+    """Runs several analyzers over the same batch concurrently, tokenizing once per distinct tokenizer."""
+
+    def __init__(self, analysis_types=None):
+        # The models run side by side on these threads and share torch's process-wide intra-op
+        # pool; ANALYZER_INTRA_OP_THREADS sizes that pool for every analysis, not just this one
+        self.analysis_types = list(analysis_types or COMBINED_ANALYSIS_TYPES)
+        self._executor = ThreadPoolExecutor(
+            max_workers=len(self.analysis_types),
+            thread_name_prefix="combined-analyzer"
+        )
+
+    def analyze_batch(self, texts, batch_size=None):
+        """Return one {analysis_type: label} dict per text, in input order."""
+        return [
+            {name: scores_to_label(name, scores) for name, scores in result.items()}
+            for result in self.score_batch(texts, batch_size=batch_size)
+        ]
+
+    def score_batch(self, texts, batch_size=None):
+        """Return one {analysis_type: class probabilities} dict per text, in input order."""
+        if not texts:
+            return []
+        analyzers = {name: AnalyzerFactory.get_analyzer(name) for name in self.analysis_types}
+        for analyzer in analyzers.values():
+            analyzer._check_ready()
+        batch_size = batch_size or get_batch_size()
+        contents = [preprocess(text) for text in texts]
+        results = [{} for _ in contents]
+        cached = {
+            name: analyzer.lookup(contents) if isinstance(analyzer, CachedAnalyzer) else [None] * len(contents)
+            for name, analyzer in analyzers.items()
+        }
+        for name, scores in cached.items():
+            for result, item_scores in zip(results, scores):
+                result[name] = item_scores
+        missing = list(dict.fromkeys(
+            content for content, result in zip(contents, results)
+            if any(item_scores is None for item_scores in result.values())
+        ))
+        if missing:
+            fresh = self._analyze_missing(analyzers, missing, batch_size)
+            for name, analyzer in analyzers.items():
+                if isinstance(analyzer, CachedAnalyzer):
+                    analyzer.store(fresh[name])
+            for content, result in zip(contents, results):
+                for name, item_scores in result.items():
+                    if item_scores is None:
+                        result[name] = fresh[name][content]
+        return results
+
+    def _analyze_missing(self, analyzers, contents, batch_size):
+        """Run every model over the contents, returning {analysis_type: {content: class probabilities}}."""
+        if microbatching_enabled() or AnalyzerFactory.worker_pool_enabled():
+            # The models run in scheduler threads or pool workers, which batch and overlap the work themselves
+            futures = {
+                name: self._executor.submit(
+                    analyzer.analyzer.score_batch if isinstance(analyzer, CachedAnalyzer) else analyzer.score_batch,
+                    contents
+                )
+                for name, analyzer in analyzers.items()
+            }
+            return {name: dict(zip(contents, future.result())) for name, future in futures.items()}
+
+        chunks = list(length_sorted_batches(contents, batch_size))
+
+        encodings = {}
+        for analyzer in analyzers.values():
+            key = analyzer.tokenizer_key
+            if key not in encodings:
+                encodings[key] = [analyzer.encode([contents[i] for i in chunk]) for chunk in chunks]
+
+        futures = {
+            name: self._executor.submit(self._run_model, analyzer, chunks, encodings[analyzer.tokenizer_key], len(contents))
+            for name, analyzer in analyzers.items()
+        }
+        return {name: dict(zip(contents, future.result())) for name, future in futures.items()}
+
+    def shutdown(self):
+        """Stop the per-model threads; only needed for analyzers made outside get_combined_analyzer()."""
+        self._executor.shutdown(wait=True)
+
+    @staticmethod
+    def _run_model(analyzer, chunks, encoded_chunks, size):
+        results = [None] * size
+        for chunk, encoded_input in zip(chunks, encoded_chunks):
+            try:
+                scores = analyzer.predict(encoded_input)
+            except Exception as e:
+                logger.error(f"Error analyzing {analyzer.name.lower()}: {e}")
+                continue
+            for i, item_scores in zip(chunk, scores):
+                results[i] = item_scores
+        return results
+
+_combined_analyzer = None
+_combined_lock = threading.Lock()
+
+def get_combined_analyzer():
+    global _combined_analyzer
+    with _combined_lock:
+        if _combined_analyzer is None:
+            _combined_analyzer = CombinedAnalyzer()
+    return _combined_analyzer
 
 def analyze_tweet(text, analysis_type):
     analyzer = AnalyzerFactory.get_analyzer(analysis_type)
-    return analyzer.analyze(text)
\ No newline at end of file
+    return analyzer.analyze(text)
+
+def analyze_tweets(texts, analysis_type, batch_size=None):
+    analyzer = AnalyzerFactory.get_analyzer(analysis_type)
+    return analyzer.analyze_batch(texts, batch_size=batch_size)
+
+def analyze_tweets_combined(texts, batch_size=None):
+    return get_combined_analyzer().analyze_batch(texts, batch_size=batch_size)
+
+def score_tweets(texts, analysis_type, batch_size=None):
+    analyzer = AnalyzerFactory.get_analyzer(analysis_type)
+    return analyzer.score_batch(texts, batch_size=batch_size)
+
+def score_tweets_combined(texts, batch_size=None):
+    return get_combined_analyzer().score_batch(texts, batch_size=batch_size)
+
+def model_revision(analysis_type):
+    """Model and revision currently scoring an analysis type, as recorded on Tweet rows."""
+    analyzer = AnalyzerFactory.get_analyzer(analysis_type)
+    return f"{analyzer.model_name}@{analyzer.revision}"
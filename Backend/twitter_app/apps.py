@@ -1,6 +1,19 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class TwitterAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'twitter_app'
+
+
+def start_warm_up():
+    """Load the models in the background if ANALYZER_WARMUP is on.
+
+    Called from the WSGI/ASGI entry points rather than AppConfig.ready(), so only processes that serve
+    requests load models: runserver's serving child imports them, its autoreloader and commands such as
+    migrate, shell and test don't.
+    """
+    if getattr(settings, 'ANALYZER_WARMUP', False):
+        from .analyzer import AnalyzerFactory
+        AnalyzerFactory.warm_up()
@@ -0,0 +1,72 @@
+import logging
+
+import torch
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKEND = "fp32"
+
+
+class InferenceBackend:
+    """Runs a sequence classification model over an encoded batch and returns its logits."""
+    name = None
+
+    def __init__(self, model):
+        self.model = self.prepare(model)
+
+    def prepare(self, model):
+        return model
+
+    def __call__(self, encoded_input):
+        with torch.no_grad():
+            return self.model(**encoded_input)[0]
+
+
+class TorchBackend(InferenceBackend):
+    """Plain fp32 eager execution, the reference the other backends are compared against."""
+    name = "fp32"
+
+
+class QuantizedBackend(InferenceBackend):
+    """int8 dynamic quantization of the Linear layers, which hold nearly all of RoBERTa's compute."""
+    name = "int8"
+
+    def prepare(self, model):
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+class TracedBackend(InferenceBackend):
+    """TorchScript graph traced from the eager model, avoiding Python dispatch overhead per layer."""
+    name = "traced"
+
+    def prepare(self, model):
+        model.config.return_dict = False
+        example = torch.ones((2, 8), dtype=torch.long)
+        with torch.no_grad():
+            traced = torch.jit.trace(model, (example, torch.ones_like(example)), strict=False)
+        return traced.eval()
+
+    def __call__(self, encoded_input):
+        with torch.no_grad():
+            return self.model(encoded_input["input_ids"], encoded_input["attention_mask"])[0]
+
+
+BACKENDS = {backend.name: backend for backend in [TorchBackend, QuantizedBackend, TracedBackend]}
+
+
+def get_backend_name(analysis_type):
+    return getattr(settings, 'ANALYZER_BACKENDS', {}).get(analysis_type, DEFAULT_BACKEND)
+
+
+def create_backend(name, model):
+    """Build the named backend around a loaded model, falling back to fp32 if it can't be built."""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown inference backend: {name}")
+    try:
+        return BACKENDS[name](model)
+    except Exception as e:
+        if name == DEFAULT_BACKEND:
+            raise
+        logger.error(f"Error creating {name} backend, falling back to {DEFAULT_BACKEND}: {e}")
+        return BACKENDS[DEFAULT_BACKEND](model)
@@ -0,0 +1,227 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEMORY_SIZE = 10000
+DEFAULT_DISK_SIZE = 1000000  # Rows kept on disk; the oldest are deleted beyond this
+DISK_PRUNE_INTERVAL = 1000  # Rows written between checks of the disk size
+SQLITE_BATCH_SIZE = 500
+
+
+def content_digest(content):
+    """Hash of the preprocessed tweet text, used as the content part of cache keys."""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+class LRUCache:
+    """Bounded in-process cache that evicts the least recently used entry."""
+
+    def __init__(self, max_size=DEFAULT_MEMORY_SIZE):
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class DiskCache:
+    """Persistent SQLite tier so analysis results survive restarts, bounded to `max_rows` oldest-first."""
+
+    def __init__(self, path, max_rows=DEFAULT_DISK_SIZE):
+        self.path = str(path)
+        self.max_rows = max_rows
+        self.evictions = 0
+        self._local = threading.local()
+        self._written = 0
+        self._prune_lock = threading.Lock()
+        self._create_table()
+        self.prune()
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def _create_table(self):
+        with self._connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS analysis_scores ("
+                "model TEXT NOT NULL, revision TEXT NOT NULL, digest TEXT NOT NULL, "
+                "result TEXT NOT NULL, created_at REAL NOT NULL, "
+                "PRIMARY KEY (model, revision, digest))"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS analysis_scores_created_at ON analysis_scores (created_at)"
+            )
+
+    def get_many(self, keys):
+        """Return a {key: result} dict for the keys found on disk."""
+        found = {}
+        connection = self._connection()
+        digests_by_model = {}
+        for model, revision, digest in keys:
+            digests_by_model.setdefault((model, revision), []).append(digest)
+        for (model, revision), digests in digests_by_model.items():
+            for start in range(0, len(digests), SQLITE_BATCH_SIZE):
+                chunk = digests[start:start + SQLITE_BATCH_SIZE]
+                placeholders = ", ".join("?" * len(chunk))
+                rows = connection.execute(
+                    f"SELECT digest, result FROM analysis_scores "
+                    f"WHERE model = ? AND revision = ? AND digest IN ({placeholders})",
+                    [model, revision, *chunk]
+                )
+                for digest, result in rows:
+                    found[(model, revision, digest)] = json.loads(result)
+        return found
+
+    def set_many(self, items):
+        now = time.time()
+        with self._connection() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO analysis_scores (model, revision, digest, result, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(*key, json.dumps(value), now) for key, value in items.items()]
+            )
+        with self._prune_lock:
+            self._written += len(items)
+            due = self._written >= DISK_PRUNE_INTERVAL
+            if due:
+                self._written = 0
+        if due:
+            self.prune()
+
+    def prune(self):
+        """Delete the oldest rows beyond max_rows, returning how many went."""
+        with self._connection() as connection:
+            (count,) = connection.execute("SELECT COUNT(*) FROM analysis_scores").fetchone()
+            excess = count - self.max_rows
+            if excess <= 0:
+                return 0
+            connection.execute(
+                "DELETE FROM analysis_scores WHERE rowid IN "
+                "(SELECT rowid FROM analysis_scores ORDER BY created_at LIMIT ?)",
+                [excess]
+            )
+        self.evictions += excess
+        return excess
+
+    def clear(self):
+        with self._connection() as connection:
+            connection.execute("DELETE FROM analysis_scores")
+
+
+class AnalysisCache:
+    """Two-tier cache of class-probability vectors keyed on (model name, model revision, content hash)."""
+
+    def __init__(self, memory_size=DEFAULT_MEMORY_SIZE, disk_path=None, disk_size=DEFAULT_DISK_SIZE):
+        self.memory = LRUCache(memory_size)
+        self.disk = None
+        if disk_path:
+            try:
+                self.disk = DiskCache(disk_path, disk_size)
+            except sqlite3.Error as e:
+                logger.error(f"Analysis cache disk tier unavailable: {e}")
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            memory_size=getattr(settings, 'ANALYSIS_CACHE_SIZE', DEFAULT_MEMORY_SIZE),
+            disk_path=getattr(settings, 'ANALYSIS_CACHE_PATH', None),
+            disk_size=getattr(settings, 'ANALYSIS_CACHE_DISK_SIZE', DEFAULT_DISK_SIZE)
+        )
+
+    @staticmethod
+    def make_key(model_name, revision, content):
+        return (model_name, revision, content_digest(content))
+
+    def get_many(self, keys):
+        """Look up keys in memory then on disk, returning {key: result} for the hits."""
+        found = {}
+        missing = []
+        for key in dict.fromkeys(keys):
+            value = self.memory.get(key)
+            if value is not None:
+                found[key] = value
+            else:
+                missing.append(key)
+        memory_hits = len(found)
+
+        disk_found = {}
+        if self.disk is not None and missing:
+            try:
+                disk_found = self.disk.get_many(missing)
+            except sqlite3.Error as e:
+                logger.error(f"Analysis cache disk read failed: {e}")
+            for key, value in disk_found.items():
+                self.memory.set(key, value)
+            found.update(disk_found)
+
+        # Counters are per distinct key, so a retweet storm counts as a single lookup
+        with self._lock:
+            self.memory_hits += memory_hits
+            self.disk_hits += len(disk_found)
+            self.misses += len(missing) - len(disk_found)
+        return found
+
+    def set_many(self, items):
+        items = {key: value for key, value in items.items() if value is not None}
+        if not items:
+            return
+        for key, value in items.items():
+            self.memory.set(key, value)
+        if self.disk is not None:
+            try:
+                self.disk.set_many(items)
+            except sqlite3.Error as e:
+                logger.error(f"Analysis cache disk write failed: {e}")
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self):
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.memory.evictions,
+            "disk_evictions": self.disk.evictions if self.disk is not None else 0,
+            "memory_size": len(self.memory),
+        }
@@ -0,0 +1,183 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from .models import AnalysisJob, Tweet
+from .pipeline import run_analysis, save_search_history
+from .scraper import ScraperUnavailable
+from .serializers import TweetSerializer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOB_WORKERS = 2
+DEFAULT_JOB_PROGRESS_INTERVAL = 1.0  # Seconds between progress writes for one job
+DEFAULT_JOB_HEARTBEAT_INTERVAL = 30  # Seconds between heartbeats of the jobs a process owns
+MISSED_HEARTBEATS = 3  # Unfinished jobs this many intervals without a heartbeat count as interrupted
+
+_executor = None
+_executor_lock = threading.Lock()
+# Jobs queued or running in this process, kept alive by the heartbeat thread
+_owned_jobs = set()
+_owned_lock = threading.Lock()
+_heartbeat = None
+
+
+def heartbeat_interval():
+    return getattr(settings, 'ANALYSIS_JOB_HEARTBEAT_INTERVAL', DEFAULT_JOB_HEARTBEAT_INTERVAL)
+
+
+def get_job_executor():
+    """Threads that run analysis jobs, kept apart from the threads serving HTTP requests."""
+    global _executor, _heartbeat
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'ANALYSIS_JOB_WORKERS', DEFAULT_JOB_WORKERS),
+                thread_name_prefix="analysis-job"
+            )
+            _heartbeat = threading.Thread(target=_send_heartbeats, name="analysis-job-heartbeat", daemon=True)
+            _heartbeat.start()
+    return _executor
+
+
+def _send_heartbeats():
+    while True:
+        time.sleep(heartbeat_interval())
+        with _owned_lock:
+            job_ids = list(_owned_jobs)
+        if not job_ids:
+            continue
+        try:
+            AnalysisJob.objects.filter(id__in=job_ids).update(heartbeat_at=timezone.now())
+        except Exception as e:
+            logger.error(f"Error recording analysis job heartbeats: {e}")
+        finally:
+            connection.close()
+
+
+def fail_interrupted_jobs():
+    """Mark unfinished jobs whose process stopped sending heartbeats, e.g. after a restart, as failed.
+
+    Jobs run on threads of the process that accepted them and do not survive it. Each process
+    refreshes heartbeat_at for the jobs it owns, so live jobs of other processes are left alone.
+    """
+    cutoff = timezone.now() - timedelta(seconds=MISSED_HEARTBEATS * heartbeat_interval())
+    count = AnalysisJob.objects.filter(
+        status__in=[AnalysisJob.QUEUED, AnalysisJob.RUNNING],
+        heartbeat_at__lt=cutoff
+    ).update(status=AnalysisJob.FAILED, error="Interrupted by a server restart", finished_at=timezone.now())
+    if count:
+        logger.warning(f"Marked {count} analysis jobs interrupted by a restart as failed")
+    return count
+
+
+def submit_job(user, analysis_type, max_tweets, username=None, hashtag=None):
+    """Queue a search for background analysis and return its AnalysisJob."""
+    executor = get_job_executor()
+    job = AnalysisJob.objects.create(
+        user=user if user is not None and user.is_authenticated else None,
+        search_query=username if username else hashtag,
+        search_type="username" if username else "hashtag",
+        analysis_type=analysis_type,
+        max_tweets=max_tweets,
+        heartbeat_at=timezone.now()
+    )
+    with _owned_lock:
+        _owned_jobs.add(job.id)
+    executor.submit(run_job, job.id)
+    return job
+
+
+class ProgressRecorder:
+    """Pipeline on_progress callback that writes a job's progress, at most once per interval."""
+
+    def __init__(self, job_id, interval=None):
+        self.job_id = job_id
+        self.interval = interval if interval is not None else getattr(settings, 'ANALYSIS_JOB_PROGRESS_INTERVAL', DEFAULT_JOB_PROGRESS_INTERVAL)
+        self.latest = {}
+        self._written = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, progress):
+        with self._lock:
+            self.latest = progress
+            now = time.monotonic()
+            if now - self._written < self.interval:
+                return
+            self._written = now
+        # Called from the pipeline's stage threads, each with its own connection
+        AnalysisJob.objects.filter(id=self.job_id).update(progress=progress)
+
+
+def run_job(job_id):
+    try:
+        job = AnalysisJob.objects.get(id=job_id)
+        job.status = AnalysisJob.RUNNING
+        job.started_at = timezone.now()
+        job.save(update_fields=["status", "started_at"])
+        username = job.search_query if job.search_type == "username" else None
+        hashtag = job.search_query if job.search_type == "hashtag" else None
+
+        recorder = ProgressRecorder(job.id)
+        try:
+            tweets, _ = run_analysis(job.analysis_type, job.max_tweets, username, hashtag, on_progress=recorder)
+        except Exception as e:
+            if isinstance(e, ScraperUnavailable):
+                logger.warning(f"Analysis job {job.id} could not get a scraper: {e}")
+            else:
+                logger.error(f"Error in analysis job {job.id}: {e}")
+            _finish(job, AnalysisJob.FAILED, recorder.latest, error=str(e))
+            return
+
+        job.result_tweets = [tweet.id for tweet in tweets]
+        if job.user is not None and tweets:
+            job.search_history = save_search_history(job.user, job.analysis_type, tweets, username, hashtag)
+        _finish(job, AnalysisJob.SUCCEEDED, recorder.latest)
+    except Exception as e:
+        logger.error(f"Analysis job {job_id} failed: {e}")
+    finally:
+        with _owned_lock:
+            _owned_jobs.discard(job_id)
+        connection.close()
+
+
+def _finish(job, status, progress, error=None):
+    job.status = status
+    job.progress = progress
+    job.error = error
+    job.finished_at = timezone.now()
+    job.save()
+
+
+def job_status(job):
+    progress = job.progress or {}
+    return {
+        "job_id": str(job.id),
+        "status": job.status,
+        "analysis_type": job.analysis_type,
+        "search_query": job.search_query,
+        "search_type": job.search_type,
+        "max_tweets": job.max_tweets,
+        "progress": {
+            "scraped": progress.get("source", 0),
+            "analyzed": progress.get("analyze", 0),
+            "saved": progress.get("persist", 0),
+        },
+        "error": job.error,
+        "history_id": job.search_history_id,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+
+
+def job_results(job):
+    """Serialized tweets of a finished job, in the order the pipeline produced them."""
+    rows = Tweet.objects.in_bulk(job.result_tweets)
+    return [TweetSerializer(rows[tweet_id]).data for tweet_id in job.result_tweets if tweet_id in rows]
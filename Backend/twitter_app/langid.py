@@ -0,0 +1,184 @@
+import logging
+import re
+import threading
+
+import numpy as np
+from langdetect import DetectorFactory, detect
+from langdetect.detector_factory import init_factory
+
+logger = logging.getLogger(__name__)
+
+# Unicode blocks of the scripts we tell apart, as (first, last, script)
+SCRIPT_RANGES = [
+    (0x0041, 0x005A, "ascii"),
+    (0x0061, 0x007A, "ascii"),
+    (0x00C0, 0x024F, "latin"),
+    (0x0370, 0x03FF, "greek"),
+    (0x0400, 0x04FF, "cyrillic"),
+    (0x0590, 0x05FF, "hebrew"),
+    (0x0600, 0x06FF, "arabic"),
+    (0x0750, 0x077F, "arabic"),
+    (0x0900, 0x097F, "devanagari"),
+    (0x0980, 0x09FF, "bengali"),
+    (0x0A00, 0x0A7F, "gurmukhi"),
+    (0x0A80, 0x0AFF, "gujarati"),
+    (0x0B80, 0x0BFF, "tamil"),
+    (0x0C00, 0x0C7F, "telugu"),
+    (0x0C80, 0x0CFF, "kannada"),
+    (0x0D00, 0x0D7F, "malayalam"),
+    (0x0E00, 0x0E7F, "thai"),
+    (0x1100, 0x11FF, "hangul"),
+    (0x1E00, 0x1EFF, "latin"),
+    (0x3040, 0x309F, "kana"),
+    (0x30A0, 0x30FF, "kana"),
+    (0x3130, 0x318F, "hangul"),
+    (0x3400, 0x4DBF, "han"),
+    (0x4E00, 0x9FFF, "han"),
+    (0xAC00, 0xD7AF, "hangul"),
+]
+SCRIPTS = sorted({script for _, _, script in SCRIPT_RANGES})
+SCRIPT_INDEX = {script: index for index, script in enumerate(SCRIPTS)}
+OTHER = len(SCRIPTS)  # Digits, punctuation, emoji and anything outside the table
+
+_range_starts = np.array([first for first, _, _ in SCRIPT_RANGES], dtype=np.uint32)
+_range_ends = np.array([last for _, last, _ in SCRIPT_RANGES], dtype=np.uint32)
+_range_scripts = np.array([SCRIPT_INDEX[script] for _, _, script in SCRIPT_RANGES], dtype=np.int64)
+
+# Scripts used by a single language we care about, in langdetect's codes.
+# Only 'en' versus everything else decides whether a tweet gets translated.
+SINGLE_LANGUAGE_SCRIPTS = {
+    "greek": "el",
+    "hebrew": "he",
+    "arabic": "ar",
+    "devanagari": "hi",
+    "bengali": "bn",
+    "gurmukhi": "pa",
+    "gujarati": "gu",
+    "tamil": "ta",
+    "telugu": "te",
+    "kannada": "kn",
+    "malayalam": "ml",
+    "thai": "th",
+    "hangul": "ko",
+    "kana": "ja",
+    "han": "zh-cn",
+}
+DOMINANT_SCRIPT_SHARE = 0.9
+
+ENGLISH_WORDS = {
+    "the", "and", "is", "are", "was", "were", "be", "been", "have", "has", "had", "i", "you", "he", "she",
+    "it", "we", "they", "my", "your", "his", "her", "our", "their", "this", "that", "these", "those", "of",
+    "to", "in", "on", "for", "with", "at", "by", "from", "about", "but", "or", "not", "what", "who", "how",
+    "why", "when", "will", "would", "can", "could", "should", "just", "so", "if", "all", "do", "does", "did",
+    "get", "got", "love", "like", "good", "bad", "great", "today", "people", "me", "him", "them", "us", "an",
+    "there", "here", "out", "up", "more", "than", "time", "know", "think", "want", "going", "really",
+}
+# Frequent words of the other Latin-script languages langdetect sees most in our traffic
+OTHER_LATIN_WORDS = {
+    "el", "la", "los", "las", "y", "es", "que", "de", "en", "por", "para", "con", "una", "muy", "pero",
+    "le", "les", "et", "est", "une", "des", "du", "pour", "pas", "avec", "je", "tu", "nous", "vous",
+    "der", "die", "das", "und", "ist", "ich", "nicht", "mit", "ein", "eine", "auf", "zu", "sie",
+    "o", "os", "um", "uma", "com", "mas", "il", "di", "che", "non", "sono", "per", "het", "een", "ik",
+    "yang", "dan", "ini", "itu", "tidak", "aku", "ya", "ne", "bir", "ve", "bu", "ama",
+}
+ENGLISH_WORD_SHARE = 0.2
+
+URL_PATTERN = re.compile(r"https?://\S+|www\.\S+")
+MENTION_PATTERN = re.compile(r"@\w+")
+WORD_PATTERN = re.compile(r"[a-z']+")
+
+_fallback_lock = threading.Lock()
+_fallback_ready = False
+
+
+def clean_text(text):
+    """Drop URLs and @mentions, which say nothing about the language; keep hashtag words."""
+    return MENTION_PATTERN.sub(" ", URL_PATTERN.sub(" ", text)).replace("#", " ")
+
+
+def script_counts(texts):
+    """Count the letters of each script in every text, as a (len(texts), len(SCRIPTS) + 1) array.
+
+    All texts are classified in one pass over a single array of code points.
+    """
+    encoded = [text.encode("utf-32-le") for text in texts]
+    lengths = np.array([len(data) // 4 for data in encoded], dtype=np.int64)
+    codepoints = np.frombuffer(b"".join(encoded), dtype=np.uint32)
+
+    position = np.searchsorted(_range_starts, codepoints, side="right") - 1
+    in_table = (position >= 0) & (codepoints <= _range_ends[np.maximum(position, 0)])
+    scripts = np.where(in_table, _range_scripts[np.maximum(position, 0)], OTHER)
+
+    owners = np.repeat(np.arange(len(texts)), lengths)
+    counts = np.zeros((len(texts), OTHER + 1), dtype=np.int64)
+    np.add.at(counts, (owners, scripts), 1)
+    return counts
+
+
+def looks_english(text):
+    words = WORD_PATTERN.findall(text.lower())
+    if not words:
+        return False
+    english = sum(word in ENGLISH_WORDS for word in words)
+    other = sum(word in OTHER_LATIN_WORDS for word in words)
+    return english > other and english >= ENGLISH_WORD_SHARE * len(words)
+
+
+def _init_fallback():
+    """Load langdetect's profiles once and fix its seed so repeated calls give the same answer."""
+    global _fallback_ready
+    with _fallback_lock:
+        if not _fallback_ready:
+            DetectorFactory.seed = 0
+            init_factory()
+            _fallback_ready = True
+
+
+def detect_fallback(text):
+    """Full n-gram detection for the cases the script check can't settle."""
+    _init_fallback()
+    try:
+        return detect(text)
+    except Exception as e:
+        logger.error(f"Language detection error: {e}")
+        return 'unknown'
+
+
+def identify_languages(texts):
+    """Identify the language of every text, using the full detector only where the script check is ambiguous.
+
+    Pure ASCII text made of common English words is 'en', and text written in a single non-Latin script
+    maps straight to that script's language. Text with no letters at all is 'unknown'.
+    """
+    unique = list(dict.fromkeys(texts))
+    cleaned = [clean_text(text) for text in unique]
+    counts = script_counts(cleaned)
+    letters = counts[:, :OTHER].sum(axis=1)
+    dominant = counts[:, :OTHER].argmax(axis=1)
+    ascii_only = counts[:, SCRIPT_INDEX["ascii"]] == letters
+    kana = counts[:, SCRIPT_INDEX["kana"]]
+    japanese = kana + counts[:, SCRIPT_INDEX["han"]]
+
+    languages = {}
+    fallback = 0
+    for i, text in enumerate(unique):
+        script = SCRIPTS[dominant[i]]
+        if letters[i] == 0:
+            language = 'unknown'
+        elif ascii_only[i] and looks_english(cleaned[i]):
+            language = 'en'
+        elif kana[i] and japanese[i] >= DOMINANT_SCRIPT_SHARE * letters[i]:
+            # Japanese mixes kanji with kana, so neither script alone need dominate
+            language = "ja"
+        elif script in SINGLE_LANGUAGE_SCRIPTS and counts[i, dominant[i]] >= DOMINANT_SCRIPT_SHARE * letters[i]:
+            language = SINGLE_LANGUAGE_SCRIPTS[script]
+        else:
+            language = detect_fallback(cleaned[i])
+            fallback += 1
+        languages[text] = language
+    logger.debug(f"Identified {len(unique)} languages, {fallback} needed the full detector")
+    return [languages[text] for text in texts]
+
+
+def identify_language(text):
+    return identify_languages([text])[0]
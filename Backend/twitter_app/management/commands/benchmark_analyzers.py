@@ -0,0 +1,235 @@
+import json
+import os
+import platform
+import random
+import subprocess
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import psutil
+import torch
+from django.core.management.base import BaseCommand
+
+from twitter_app.analyzer import (
+    COMBINED_ANALYSIS_TYPES,
+    AnalyzerFactory,
+    CachedAnalyzer,
+    CombinedAnalyzer,
+)
+from twitter_app.backends import BACKENDS, DEFAULT_BACKEND
+from twitter_app.models import ANALYSIS_LABELS
+
+DEFAULT_SAMPLE = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'labelled_tweets.json')
+TINY_SPECIAL_TOKENS = ["<s>", "<pad>", "</s>", "<unk>"]
+
+
+def build_tiny_tokenizer(texts):
+    """Word-level tokenizer built from the sample itself, so no vocabulary has to be downloaded."""
+    from tokenizers import Tokenizer, models, pre_tokenizers
+    from transformers import PreTrainedTokenizerFast
+
+    vocab = {token: index for index, token in enumerate(TINY_SPECIAL_TOKENS)}
+    for text in texts:
+        for word in text.lower().split():
+            vocab.setdefault(word, len(vocab))
+    tokenizer = Tokenizer(models.WordLevel(vocab, unk_token="<unk>"))
+    tokenizer.pre_tokenizer = pre_tokenizers.WhitespaceSplit()
+    return PreTrainedTokenizerFast(
+        tokenizer_object=tokenizer,
+        bos_token="<s>",
+        eos_token="</s>",
+        unk_token="<unk>",
+        pad_token="<pad>",
+    )
+
+
+def build_tiny_model(vocab_size, num_labels):
+    """Randomly initialised two-layer RoBERTa with the same head shape as the real analyzer."""
+    from transformers import RobertaConfig, RobertaForSequenceClassification
+
+    torch.manual_seed(0)
+    config = RobertaConfig(
+        vocab_size=vocab_size,
+        hidden_size=64,
+        num_hidden_layers=2,
+        num_attention_heads=4,
+        intermediate_size=128,
+        max_position_embeddings=514,
+        num_labels=num_labels,
+        pad_token_id=1,
+    )
+    return RobertaForSequenceClassification(config).eval()
+
+
+class RSSSampler:
+    """Polls the process RSS in the background, so each configuration reports its own peak.
+
+    ru_maxrss is a high-water mark for the whole process and never drops between configurations.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.process = psutil.Process()
+        self.start_mb = self.peak_mb = self._rss_mb()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _rss_mb(self):
+        return self.process.memory_info().rss / (1024 * 1024)
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak_mb = max(self.peak_mb, self._rss_mb())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self.peak_mb = max(self.peak_mb, self._rss_mb())
+
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=os.path.dirname(__file__)
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = "Benchmark analyzer throughput, latency percentiles and peak RSS across batch sizes and thread counts."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tiny', action='store_true', help="Use small locally built models so the run works offline")
+        parser.add_argument('--types', nargs='+', default=COMBINED_ANALYSIS_TYPES + ['combined'])
+        parser.add_argument('--batch-sizes', nargs='+', type=int, default=[1, 8, 32])
+        parser.add_argument('--threads', nargs='+', type=int, default=[1, os.cpu_count() or 1])
+        parser.add_argument('--backend', default=DEFAULT_BACKEND, choices=list(BACKENDS), help="Inference backend for --tiny models")
+        parser.add_argument('--tweets', type=int, default=128, help="Tweets per timed pass")
+        parser.add_argument('--repeats', type=int, default=3, help="Timed passes per configuration")
+        parser.add_argument('--sample', default=DEFAULT_SAMPLE)
+        parser.add_argument('--output', help="Write results as JSON to this path")
+        parser.add_argument('--baseline', help="JSON results from an earlier run to compare throughput against")
+
+    def handle(self, *args, **options):
+        with open(options['sample'], encoding='utf-8') as f:
+            sample = [row['text'] for row in json.load(f)]
+        texts = self._make_texts(sample, options['tweets'])
+        self._install_analyzers(options, sample)
+        initial_threads = torch.get_num_threads()
+
+        results = []
+        for analysis_type in options['types']:
+            for threads in options['threads']:
+                for batch_size in options['batch_sizes']:
+                    result = self._run(analysis_type, threads, batch_size, texts, options['repeats'])
+                    results.append(result)
+                    self.stdout.write(
+                        f"{analysis_type:<10} threads={threads:<3} batch={batch_size:<4} "
+                        f"{result['tweets_per_second']:>9.1f} tweets/s  "
+                        f"p50={result['latency_ms']['p50']:.1f}ms p95={result['latency_ms']['p95']:.1f}ms "
+                        f"p99={result['latency_ms']['p99']:.1f}ms  peak_rss={result['peak_rss_mb']:.0f}MB (+{result['rss_growth_mb']:.0f}MB)"
+                    )
+        torch.set_num_threads(initial_threads)
+
+        report = {
+            "meta": {
+                "commit": current_commit(),
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "tiny": options['tiny'],
+                "backend": options['backend'] if options['tiny'] else None,
+                "tweets": len(texts),
+                "repeats": options['repeats'],
+                "cpu_count": os.cpu_count(),
+                "python": platform.python_version(),
+                "torch": torch.__version__,
+            },
+            "results": results,
+        }
+        if options['baseline']:
+            self._compare(report, options['baseline'])
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+    def _make_texts(self, sample, count):
+        """Deterministic mix of sample tweets, truncated and concatenated to vary the padding per batch."""
+        rng = random.Random(0)
+        texts = []
+        while len(texts) < count:
+            words = " ".join(rng.sample(sample, rng.randint(1, 3))).split()
+            texts.append(" ".join(words[:rng.randint(3, len(words))]))
+        return texts
+
+    def _install_analyzers(self, options, sample):
+        for analysis_type in COMBINED_ANALYSIS_TYPES:
+            if options['tiny']:
+                analyzer_class = AnalyzerFactory._analyzer_classes[analysis_type]
+                tokenizer = build_tiny_tokenizer(sample)
+                model = build_tiny_model(len(tokenizer), len(ANALYSIS_LABELS[analysis_type]))
+                analyzer = analyzer_class.from_components(model, tokenizer, options['backend'])
+            else:
+                analyzer = AnalyzerFactory.get_analyzer(analysis_type)
+                # Measure the models, not the result cache
+                if isinstance(analyzer, CachedAnalyzer):
+                    analyzer = analyzer.analyzer
+            AnalyzerFactory.register(analysis_type, analyzer)
+
+    def _run(self, analysis_type, threads, batch_size, texts, repeats):
+        torch.set_num_threads(threads)
+        if analysis_type == 'combined':
+            runner = CombinedAnalyzer()
+        else:
+            runner = AnalyzerFactory.get_analyzer(analysis_type)
+        batches = [texts[start:start + batch_size] for start in range(0, len(texts), batch_size)]
+
+        try:
+            with RSSSampler() as rss:
+                runner.score_batch(batches[0], batch_size=batch_size)  # Warm-up, untimed
+                latencies = []
+                started = time.perf_counter()
+                for _ in range(repeats):
+                    for batch in batches:
+                        batch_started = time.perf_counter()
+                        runner.score_batch(batch, batch_size=batch_size)
+                        latencies.append((time.perf_counter() - batch_started) * 1000)
+                elapsed = time.perf_counter() - started
+        finally:
+            if analysis_type == 'combined':
+                runner.shutdown()
+
+        return {
+            "analysis_type": analysis_type,
+            "threads": threads,
+            "batch_size": batch_size,
+            "tweets_per_second": len(texts) * repeats / elapsed,
+            "latency_ms": {
+                "p50": float(np.percentile(latencies, 50)),
+                "p95": float(np.percentile(latencies, 95)),
+                "p99": float(np.percentile(latencies, 99)),
+            },
+            "peak_rss_mb": rss.peak_mb,
+            "rss_growth_mb": rss.peak_mb - rss.start_mb,
+        }
+
+    def _compare(self, report, baseline_path):
+        with open(baseline_path, encoding='utf-8') as f:
+            baseline = json.load(f)
+        previous = {
+            (row["analysis_type"], row["threads"], row["batch_size"]): row["tweets_per_second"]
+            for row in baseline["results"]
+        }
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Throughput vs {baseline['meta'].get('commit')}"))
+        for row in report["results"]:
+            key = (row["analysis_type"], row["threads"], row["batch_size"])
+            if key in previous:
+                change = row["tweets_per_second"] / previous[key] - 1
+                self.stdout.write(f"  {key[0]:<10} threads={key[1]:<3} batch={key[2]:<4} {change:+.1%}")
@@ -0,0 +1,109 @@
+import json
+import os
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from transformers import AutoModelForSequenceClassification
+
+from twitter_app.analyzer import AnalyzerFactory, CachedAnalyzer, length_sorted_batches, preprocess
+from twitter_app.backends import BACKENDS, DEFAULT_BACKEND, create_backend
+from twitter_app.models import Tweet
+
+DEFAULT_SAMPLE = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'labelled_tweets.json')
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare accuracy and latency of the inference backends against fp32 on a labelled sample, "
+        "and agreement with fp32 on a larger unlabelled one."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--backends', nargs='+', default=list(BACKENDS), choices=list(BACKENDS))
+        parser.add_argument('--types', nargs='+', default=list(AnalyzerFactory._analyzer_classes))
+        parser.add_argument('--sample', default=DEFAULT_SAMPLE, help="JSON list of {text, sentiment, toxicity, emotion}")
+        parser.add_argument('--unlabelled', help="JSON list of texts (or of {text}) to measure agreement with fp32 on")
+        parser.add_argument('--stored', type=int, default=0, help="Also measure agreement on up to this many stored tweets")
+        parser.add_argument('--batch-size', type=int, default=16)
+        parser.add_argument('--repeats', type=int, default=3, help="Timed passes over the sample per backend")
+        parser.add_argument('--output', help="Write the report as JSON to this path")
+
+    def handle(self, *args, **options):
+        with open(options['sample'], encoding='utf-8') as f:
+            sample = json.load(f)
+        unlabelled = self._unlabelled_texts(options, {row['text'] for row in sample})
+        backends = [DEFAULT_BACKEND] + [name for name in options['backends'] if name != DEFAULT_BACKEND]
+
+        report = {}
+        for analysis_type in options['types']:
+            analyzer = AnalyzerFactory.get_analyzer(analysis_type)
+            if isinstance(analyzer, CachedAnalyzer):
+                analyzer = analyzer.analyzer
+            analyzer._check_ready()
+            rows = [row for row in sample if row.get(analysis_type)]
+            # Labelled rows first, so predictions[:len(rows)] line up with the labels
+            contents = [preprocess(text) for text in [row['text'] for row in rows] + unlabelled]
+            expected = [row[analysis_type] for row in rows]
+            chunks = list(length_sorted_batches(contents, options['batch_size']))
+            encoded = [analyzer.encode([contents[i] for i in chunk]) for chunk in chunks]
+
+            results = {}
+            for name in backends:
+                # Each backend gets its own copy of the weights so quantization never touches the live model
+                model = AutoModelForSequenceClassification.from_pretrained(analyzer.model_name)
+                backend = create_backend(name, model)
+                predictions = [None] * len(contents)
+                timings = []
+                for _ in range(options['repeats']):
+                    for chunk, encoded_input in zip(chunks, encoded):
+                        start = time.perf_counter()
+                        logits = backend(encoded_input)
+                        timings.append((time.perf_counter() - start) / len(chunk))
+                        for i, label in zip(chunk, np.argmax(logits.numpy(), axis=1)):
+                            predictions[i] = analyzer.labels[label]
+                results[backend.name] = {
+                    "predictions": predictions,
+                    "accuracy": float(np.mean([p == e for p, e in zip(predictions, expected)])) if expected else None,
+                    "ms_per_tweet": float(np.mean(timings) * 1000),
+                }
+
+            reference = results[DEFAULT_BACKEND]
+            for name, result in results.items():
+                # Agreement needs no labels, so it is measured on every text, unlabelled ones included
+                agreement = [p == r for p, r in zip(result["predictions"], reference["predictions"])]
+                result["agreement_with_fp32"] = float(np.mean(agreement))
+                result["disagreements"] = len(agreement) - sum(agreement)
+                result["speedup"] = reference["ms_per_tweet"] / result["ms_per_tweet"]
+            for result in results.values():
+                del result["predictions"]
+            report[analysis_type] = {"labelled": len(rows), "unlabelled": len(unlabelled), "backends": results}
+            self._print_table(analysis_type, len(rows), len(unlabelled), results)
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f"Report written to {options['output']}")
+
+    def _unlabelled_texts(self, options, labelled):
+        texts = []
+        if options['unlabelled']:
+            with open(options['unlabelled'], encoding='utf-8') as f:
+                texts.extend(item['text'] if isinstance(item, dict) else item for item in json.load(f))
+        if options['stored']:
+            # Scored as the pipeline scores them: the English translation when there is one
+            stored = Tweet.objects.order_by('-id').values_list('content', 'translated_content')[:options['stored']]
+            texts.extend(translated or content for content, translated in stored)
+        return [text for text in dict.fromkeys(texts) if text not in labelled]
+
+    def _print_table(self, analysis_type, labelled, unlabelled, results):
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"{analysis_type} ({labelled} labelled, {labelled + unlabelled} for agreement with fp32)"
+        ))
+        self.stdout.write(f"  {'backend':<8} {'accuracy':>9} {'agree fp32':>11} {'differ':>7} {'ms/tweet':>9} {'speedup':>8}")
+        for name, result in results.items():
+            accuracy = f"{result['accuracy']:>9.1%}" if result['accuracy'] is not None else f"{'-':>9}"
+            self.stdout.write(
+                f"  {name:<8} {accuracy} {result['agreement_with_fp32']:>11.1%} {result['disagreements']:>7} "
+                f"{result['ms_per_tweet']:>9.2f} {result['speedup']:>7.2f}x"
+            )
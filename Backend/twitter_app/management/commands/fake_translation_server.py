@@ -0,0 +1,90 @@
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand
+
+
+class FakeTranslationHandler(BaseHTTPRequestHandler):
+    """Answers POST /translate like LibreTranslate, prefixing each text with "[en] "."""
+
+    def do_POST(self):
+        server = self.server
+        if self.path.rstrip('/') != '/translate':
+            return self._reply(404, {"error": "Not found"})
+        payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        with server.lock:
+            server.requests += 1
+            server.in_flight += 1
+            server.peak_in_flight = max(server.peak_in_flight, server.in_flight)
+        try:
+            if server.max_in_flight and server.in_flight > server.max_in_flight:
+                return self._reply(429, {"error": "Too many requests"}, headers={"Retry-After": "1"})
+            if random.random() < server.error_rate:
+                return self._reply(503, {"error": "Injected failure"})
+            time.sleep(server.latency)
+            texts = payload.get("q", "")
+            if isinstance(texts, list):
+                translated = [f"[en] {text}" for text in texts]
+            else:
+                translated = f"[en] {texts}"
+            self._reply(200, {"translatedText": translated})
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def _reply(self, status, body, headers=None):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def make_server(host='127.0.0.1', port=0, latency_ms=0, error_rate=0.0, max_in_flight=None, verbose=False):
+    """Build a fake translation server; port 0 picks a free port, read it back from server.server_address."""
+    server = ThreadingHTTPServer((host, port), FakeTranslationHandler)
+    server.daemon_threads = True
+    server.latency = latency_ms / 1000
+    server.error_rate = error_rate
+    server.max_in_flight = max_in_flight
+    server.verbose = verbose
+    server.lock = threading.Lock()
+    server.requests = 0
+    server.in_flight = 0
+    server.peak_in_flight = 0
+    return server
+
+
+class Command(BaseCommand):
+    help = "Run a local LibreTranslate-compatible fake for exercising TRANSLATION_BACKEND=\"http\" without network access."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=5000)
+        parser.add_argument('--latency-ms', type=float, default=50, help="Simulated time per request")
+        parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of requests answered with a 503")
+        parser.add_argument('--max-in-flight', type=int, help="Answer 429 when more requests than this are in flight")
+
+    def handle(self, *args, **options):
+        server = make_server(
+            options['host'], options['port'], options['latency_ms'], options['error_rate'],
+            options['max_in_flight'], verbose=options['verbosity'] > 1
+        )
+        self.stdout.write(f"Fake translation server listening on http://{options['host']}:{server.server_address[1]}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(f"Served {server.requests} requests, peak concurrency {server.peak_in_flight}")
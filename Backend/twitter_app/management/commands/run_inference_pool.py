@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from twitter_app.workers import InferenceWorkerPool, get_pool_address, parse_pool_address
+
+
+class Command(BaseCommand):
+    help = "Load the analyzer models once and serve them from a pool of forked worker processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, help="Number of worker processes (default: ANALYZER_WORKER_POOL_SIZE)")
+        parser.add_argument('--address', help="Unix socket path or host:port (default: ANALYZER_WORKER_POOL_ADDRESS)")
+        parser.add_argument('--types', nargs='+', help="Analysis types to serve (default: all)")
+
+    def handle(self, *args, **options):
+        address = parse_pool_address(options['address']) if options['address'] else get_pool_address()
+        if not address:
+            raise CommandError("Set ANALYZER_WORKER_POOL_ADDRESS or pass --address")
+        pool = InferenceWorkerPool(workers=options['workers'], address=address, analysis_types=options['types'])
+        self.stdout.write(f"Starting inference worker pool on {address}")
+        try:
+            pool.serve_forever()
+        except ValueError as e:
+            raise CommandError(str(e))
+        except KeyboardInterrupt:
+            pool.shutdown()
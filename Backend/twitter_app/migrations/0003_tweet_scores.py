@@ -0,0 +1,28 @@
+# Generated by Django 5.1.7 on 2026-10-18 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('twitter_app', '0002_tweet_translated_content'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tweet',
+            name='emotion_scores',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='tweet',
+            name='sentiment_scores',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='tweet',
+            name='toxicity_scores',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.7 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('twitter_app', '0003_tweet_scores'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScrapeTarget',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('target_type', models.CharField(max_length=10)),
+                ('target', models.CharField(max_length=255)),
+                ('last_scraped_at', models.DateTimeField(blank=True, null=True)),
+                ('exhausted', models.BooleanField(default=False)),
+                ('recent_tweets', models.JSONField(blank=True, default=list)),
+            ],
+            options={
+                'unique_together': {('target_type', 'target')},
+            },
+        ),
+    ]
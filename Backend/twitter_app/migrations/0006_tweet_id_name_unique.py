@@ -0,0 +1,52 @@
+# Generated by Django 5.1.7 on 2026-10-18 06:13
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def merge_duplicate_tweets(apps, schema_editor):
+    """Keep the newest row of each tweet_id_name, pointing history and job results at it, and drop the rest."""
+    Tweet = apps.get_model('twitter_app', 'Tweet')
+    userSearchHistory = apps.get_model('twitter_app', 'userSearchHistory')
+    AnalysisJob = apps.get_model('twitter_app', 'AnalysisJob')
+    Through = userSearchHistory.tweets.through
+
+    duplicates = Tweet.objects.values('tweet_id_name').annotate(count=Count('id'), keep=Max('id')).filter(count__gt=1)
+    replacements = {}
+    for duplicate in duplicates:
+        ids = Tweet.objects.filter(tweet_id_name=duplicate['tweet_id_name']).values_list('id', flat=True)
+        for tweet_id in ids:
+            if tweet_id != duplicate['keep']:
+                replacements[tweet_id] = duplicate['keep']
+    if not replacements:
+        return
+
+    links = Through.objects.filter(tweet_id__in=replacements)
+    existing = set(Through.objects.filter(tweet_id__in=set(replacements.values())).values_list('usersearchhistory_id', 'tweet_id'))
+    merged = {(link.usersearchhistory_id, replacements[link.tweet_id]) for link in links} - existing
+    Through.objects.bulk_create([Through(usersearchhistory_id=history_id, tweet_id=tweet_id) for history_id, tweet_id in merged])
+    links.delete()
+
+    for job in AnalysisJob.objects.all():
+        result_tweets = list(dict.fromkeys(replacements.get(tweet_id, tweet_id) for tweet_id in job.result_tweets))
+        if result_tweets != job.result_tweets:
+            job.result_tweets = result_tweets
+            job.save(update_fields=['result_tweets'])
+
+    Tweet.objects.filter(id__in=replacements).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('twitter_app', '0005_analysisjob'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_tweets, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='tweet',
+            name='tweet_id_name',
+            field=models.CharField(max_length=255, unique=True),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.7 on 2026-10-18 06:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('twitter_app', '0006_tweet_id_name_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tweet',
+            name='emotion_revision',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='tweet',
+            name='sentiment_revision',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='tweet',
+            name='toxicity_revision',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+    ]
@@ -1,5 +1,31 @@
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
+import uuid
+
 from django.db import models
+import numpy as np
+
+# Class labels in the order the analyzers' probability vectors are stored
+ANALYSIS_LABELS = {
+    "sentiment": ["Negative", "Neutral", "Positive"],
+    "toxicity": ["not-offensive", "offensive"],
+    "emotion": ["anger", "joy", "optimism", "sadness"],
+}
+
+def pack_scores(scores):
+    """Pack a class-probability vector as float16 bytes (2 bytes per class)."""
+    if scores is None:
+        return None
+    return np.asarray(scores, dtype=np.float16).tobytes()
+
+def unpack_scores(data):
+    if not data:
+        return None
+    return np.frombuffer(bytes(data), dtype=np.float16).astype(float).tolist()
+
+def scores_to_label(analysis_type, scores):
+    if scores is None:
+        return None
+    return ANALYSIS_LABELS[analysis_type][int(np.argmax(scores))]
 
 class UserManager(BaseUserManager):
     def create_user(self, email, username, password=None, **extra_fields):
@@ -34,7 +60,7 @@ class User(AbstractBaseUser, PermissionsMixin):
     
 class Tweet(models.Model):
     id = models.AutoField(primary_key=True)
-    tweet_id_name = models.CharField(max_length=255)
+    tweet_id_name = models.CharField(max_length=255, unique=True)
     content = models.TextField()
     translated_content = models.TextField(blank=True, null=True)
     handle = models.CharField(max_length=255)
@@ -42,10 +68,77 @@ class Tweet(models.Model):
     sentiment = models.CharField(max_length=20, blank=True, default="NA")
     toxicity = models.CharField(max_length=20, blank=True, default="NA")
     emotion = models.CharField(max_length=20, blank=True, default="NA")
+    # Full class-probability vectors packed with pack_scores(), ordered like ANALYSIS_LABELS
+    sentiment_scores = models.BinaryField(blank=True, null=True)
+    toxicity_scores = models.BinaryField(blank=True, null=True)
+    emotion_scores = models.BinaryField(blank=True, null=True)
+    # "<model name>@<revision>" that produced each set of scores, so results from an older model get re-scored
+    sentiment_revision = models.CharField(max_length=255, blank=True, null=True)
+    toxicity_revision = models.CharField(max_length=255, blank=True, null=True)
+    emotion_revision = models.CharField(max_length=255, blank=True, null=True)
 
     def __str__(self):
         return self.content[:50]
 
+    def get_scores(self, analysis_type):
+        """Return {label: probability} for an analysis type, or None if it was never scored."""
+        scores = unpack_scores(getattr(self, f"{analysis_type}_scores"))
+        if scores is None:
+            return None
+        return dict(zip(ANALYSIS_LABELS[analysis_type], scores))
+
+
+class ScrapeTarget(models.Model):
+    """What we last scraped for a username or hashtag, so repeated searches can stop early or skip scraping."""
+    target_type = models.CharField(max_length=10)  # "username" or "hashtag"
+    target = models.CharField(max_length=255)
+    last_scraped_at = models.DateTimeField(blank=True, null=True)
+    # True when the last scrape reached the end of the timeline, so fewer tweets than requested is all there is
+    exhausted = models.BooleanField(default=False)
+    # tweet_id_name of the target's most recent tweets, newest first
+    recent_tweets = models.JSONField(default=list, blank=True)
+
+    class Meta:
+        unique_together = ('target_type', 'target')
+
+    def __str__(self):
+        return f"{self.target_type}:{self.target}"
+
+
+class AnalysisJob(models.Model):
+    """A search run in the background; the submitting request returns straight away with the job's id."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    STATUS_CHOICES = [(QUEUED, "Queued"), (RUNNING, "Running"), (SUCCEEDED, "Succeeded"), (FAILED, "Failed")]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, blank=True, null=True)
+    search_query = models.CharField(max_length=255)
+    search_type = models.CharField(max_length=255)
+    analysis_type = models.CharField(max_length=255)
+    max_tweets = models.PositiveIntegerField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    # Items each pipeline stage has finished, e.g. {"source": 40, "analyze": 32, ...}
+    progress = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True, null=True)
+    # Ids of the analysed tweets in result order
+    result_tweets = models.JSONField(default=list, blank=True)
+    search_history = models.ForeignKey('userSearchHistory', on_delete=models.SET_NULL, blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    # Refreshed by the process running the job; a stale one means that process is gone
+    heartbeat_at = models.DateTimeField(blank=True, null=True)
+
+    @property
+    def is_finished(self):
+        return self.status in (self.SUCCEEDED, self.FAILED)
+
+    def __str__(self):
+        return f"{self.analysis_type} job for {self.search_query} ({self.status})"
+
 
 class userSearchHistory(models.Model):
     user = models.ForeignKey(User,on_delete=models.CASCADE)
@@ -0,0 +1,431 @@
+import logging
+import os
+import queue
+import threading
+
+from django.conf import settings
+from django.db import connection, transaction
+from dotenv import load_dotenv
+
+from .analyzer import COMBINED_ANALYSIS_TYPES, model_revision, score_tweets, score_tweets_combined
+from .langid import identify_languages
+from .models import Tweet, userSearchHistory, pack_scores, scores_to_label, unpack_scores
+from .scraper import SCRAPER_BACKENDS, ScraperPool
+from .serializers import TweetSerializer
+from .targets import cached_tweets, get_scrape_target, known_tweet_ids, record_scrape, stored_tweets, tweet_id_name
+from .translation import get_translation_service
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+DEFAULT_PIPELINE_QUEUE_SIZE = 4
+DEFAULT_STAGE_WORKERS = {"detect": 1, "translate": 2, "analyze": 1, "persist": 1}
+
+# Pool of logged-in scraper sessions, one checked out per request. Browsers start on the first scrape.
+SCRAPER_BACKEND = getattr(settings, 'SCRAPER_BACKEND', 'selenium')
+if SCRAPER_BACKEND == 'replay':
+    scraper_options = {
+        "recordings_dir": settings.SCRAPER_REPLAY_DIR,
+        "latency": getattr(settings, 'SCRAPER_REPLAY_LATENCY', None),
+    }
+else:
+    scraper_options = {
+        "cookie_path": getattr(settings, 'SCRAPER_COOKIE_PATH', None),
+        "lean": getattr(settings, 'SCRAPER_LEAN_PROFILE', False),
+        "blocked_hosts": getattr(settings, 'SCRAPER_BLOCKED_HOSTS', None),
+        "record_dir": getattr(settings, 'SCRAPER_RECORD_DIR', None),
+        "record_snapshots": getattr(settings, 'SCRAPER_RECORD_SNAPSHOTS', False),
+    }
+SCRAPER_POOL = ScraperPool(
+    mail=os.getenv("TWITTER_MAIL"),
+    username=os.getenv("TWITTER_USERNAME"),
+    password=os.getenv("TWITTER_PASSWORD"),
+    size=getattr(settings, 'SCRAPER_POOL_SIZE', 2),
+    max_age=getattr(settings, 'SCRAPER_MAX_SESSION_AGE', None),
+    checkout_timeout=getattr(settings, 'SCRAPER_CHECKOUT_TIMEOUT', 120),
+    scraper_class=SCRAPER_BACKENDS[SCRAPER_BACKEND],
+    **scraper_options
+)
+
+_DONE = object()
+
+
+class Stage:
+    """One step of a Pipeline: `func` turns an input batch into an output batch on `workers` threads."""
+
+    def __init__(self, name, func, workers=1):
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+
+
+class Pipeline:
+    """Runs batches from a source through stages, each on its own worker threads, joined by bounded queues.
+
+    A full queue blocks the stage feeding it, so a slow stage throttles everything upstream rather
+    than letting work pile up in memory. Outputs come back in source order. The first error stops
+    every stage and is re-raised by run(). `progress` counts the items each stage has finished.
+    """
+
+    def __init__(self, stages, queue_size=DEFAULT_PIPELINE_QUEUE_SIZE, on_progress=None):
+        self.stages = stages
+        self.queue_size = queue_size
+        self.on_progress = on_progress
+        self.progress = {"source": 0, **{stage.name: 0 for stage in stages}}
+        self._lock = threading.Lock()
+        self._abort = threading.Event()
+        self._error = None
+
+    def run(self, source):
+        return list(self.iter_run(source))
+
+    def iter_run(self, source):
+        """Yield each batch's output as soon as it and every earlier batch are through the last stage.
+
+        Closing the generator early stops the pipeline.
+        """
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        threads = [threading.Thread(target=self._feed, args=(source, queues[0]), name="pipeline-source", daemon=True)]
+        for index, stage in enumerate(self.stages):
+            remaining = [stage.workers]
+            for worker in range(stage.workers):
+                threads.append(threading.Thread(
+                    target=self._work,
+                    args=(stage, queues[index], queues[index + 1], remaining),
+                    name=f"pipeline-{stage.name}-{worker}",
+                    daemon=True
+                ))
+        for thread in threads:
+            thread.start()
+
+        try:
+            # Batches can overtake each other in stages with several workers; hold them back until it's their turn
+            pending = {}
+            next_sequence = 0
+            while True:
+                item = self._get(queues[-1])
+                if item is None or item is _DONE:
+                    break
+                sequence, output = item
+                pending[sequence] = output
+                while next_sequence in pending:
+                    yield pending.pop(next_sequence)
+                    next_sequence += 1
+        finally:
+            self._abort.set()
+            for thread in threads:
+                thread.join()
+        if self._error is not None:
+            raise self._error
+
+    def _feed(self, source, output_queue):
+        try:
+            for sequence, batch in enumerate(source):
+                self._advance("source", batch)
+                if not self._put(output_queue, (sequence, batch)):
+                    break
+            else:
+                self._put(output_queue, _DONE)
+        except Exception as e:
+            self._fail(e)
+        finally:
+            if hasattr(source, "close"):
+                source.close()
+            connection.close()
+
+    def _work(self, stage, input_queue, output_queue, remaining):
+        try:
+            while True:
+                item = self._get(input_queue)
+                if item is None:
+                    return
+                if item is _DONE:
+                    # Let the other workers of this stage see the end too; the last one passes it on
+                    input_queue.put(_DONE)
+                    with self._lock:
+                        remaining[0] -= 1
+                        last = remaining[0] == 0
+                    if last:
+                        self._put(output_queue, _DONE)
+                    return
+                sequence, batch = item
+                output = stage.func(batch)
+                self._advance(stage.name, output)
+                if not self._put(output_queue, (sequence, output)):
+                    return
+        except Exception as e:
+            self._fail(e)
+        finally:
+            connection.close()
+
+    def _advance(self, name, batch):
+        with self._lock:
+            self.progress[name] += len(batch)
+            progress = dict(self.progress)
+        if self.on_progress:
+            self.on_progress(progress)
+
+    def _put(self, target_queue, item):
+        while not self._abort.is_set():
+            try:
+                target_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, source_queue):
+        """Next item, or None once the pipeline has been aborted."""
+        while not self._abort.is_set():
+            try:
+                return source_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return None
+
+    def _fail(self, error):
+        with self._lock:
+            if self._error is None:
+                self._error = error
+        self._abort.set()
+
+
+def stream_tweets(state=None, **options):
+    """Yield scraped tweets one scroll's worth at a time while a background thread keeps scrolling.
+
+    The scrape runs with a session from the pool, returned to the pool when the scrape ends or the
+    caller stops consuming. Scraper errors are re-raised in the caller's thread. If given, `state`
+    receives the scraper's stop_reason once the scrape finishes.
+    """
+    state = {} if state is None else state
+    batches = queue.Queue(maxsize=getattr(settings, 'SCRAPE_QUEUE_SIZE', 8))
+    stop = threading.Event()
+
+    def put(item):
+        # Give up once the consumer has gone away, so the session isn't held by a blocked thread
+        while not stop.is_set():
+            try:
+                batches.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            with SCRAPER_POOL.session() as scraper:
+                for batch in scraper.iter_tweets(**options):
+                    if not put(("batch", batch)):
+                        return
+                state["stop_reason"] = scraper.stop_reason
+        except Exception as e:
+            put(("error", e))
+            return
+        put(("done", None))
+
+    threading.Thread(target=produce, name="scrape-producer", daemon=True).start()
+    try:
+        while True:
+            kind, payload = batches.get()
+            if kind == "error":
+                raise payload
+            if kind == "done":
+                return
+            yield payload
+    finally:
+        stop.set()
+
+
+def scrape_batches(max_tweets, scrape_username=None, scrape_hashtag=None):
+    """Source stage: batches of tweet dicts for a username or hashtag, one per scroll.
+
+    A target scraped within SCRAPE_CACHE_TTL is answered from the database without scraping. Otherwise
+    tweets stored before are skipped while scrolling and filled in from the database, and the scrape
+    stops early when the stored tweets can make up the rest of `max_tweets`.
+    """
+    scrape_target = get_scrape_target(scrape_username, scrape_hashtag)
+    cached = cached_tweets(scrape_target, max_tweets)
+    if cached is not None:
+        logger.info(f"Serving {scrape_target} from tweets scraped at {scrape_target.last_scraped_at}")
+        if cached:
+            yield cached
+        return
+
+    state = {}
+    scraped = []
+    for batch in stream_tweets(
+        state,
+        max_tweets=max_tweets,
+        scrape_username=scrape_username,
+        scrape_hashtag=scrape_hashtag,
+        known_ids=known_tweet_ids(scrape_target)
+    ):
+        scraped.extend(batch)
+        yield batch
+
+    stop_reason = state.get("stop_reason")
+    # Known tweets were skipped while scrolling; the rest of max_tweets comes from the stored ones
+    if len(scraped) < max_tweets:
+        earlier = stored_tweets(scrape_target, max_tweets - len(scraped), exclude={tweet_id_name(tweet) for tweet in scraped})
+        if earlier:
+            yield earlier
+    exhausted = scrape_target.exhausted if stop_reason == "known" else stop_reason == "end"
+    record_scrape(scrape_target, scraped, exhausted)
+
+
+def detect_batch(tweets_data):
+    languages = identify_languages([tweet_dict['content'] for tweet_dict in tweets_data])
+    return list(zip(tweets_data, languages))
+
+
+def translate_batch(detected):
+    """Translate non-English tweets, returning them ready for analysis."""
+    contents = [tweet_dict['content'] for tweet_dict, _ in detected]
+    languages = [language for _, language in detected]
+    names = [tweet_id_name(tweet_dict) for tweet_dict, _ in detected]
+    translations = get_translation_service().translate_to_english(contents, languages, names)
+    prepared = []
+    for (tweet_dict, _), translated_content in zip(detected, translations):
+        original_content = tweet_dict['content']
+        prepared.append({
+            "tweet": tweet_dict,
+            "original_content": original_content,
+            "translated_content": translated_content,
+            "content_for_analysis": translated_content if translated_content is not None else original_content,
+        })
+    return prepared
+
+
+def stored_results(names, analysis_types, revisions):
+    """Scores already saved for these tweets by the current model revisions, as {tweet_id_name: {type: scores}}."""
+    fields = [f"{name}_scores" for name in analysis_types] + [f"{name}_revision" for name in analysis_types]
+    stored = {}
+    for row in Tweet.objects.filter(tweet_id_name__in=names).values('tweet_id_name', *fields):
+        result = {
+            name: unpack_scores(row[f"{name}_scores"])
+            for name in analysis_types
+            if row[f"{name}_revision"] == revisions[name]
+        }
+        stored[row['tweet_id_name']] = {name: scores for name, scores in result.items() if scores is not None}
+    return stored
+
+
+def analyze_stage(analysis_type):
+    """Scoring step for an analysis type; each item gets a {type: scores} dict for every type scored.
+
+    Tweets already scored by the current model revision keep their stored scores and skip the model.
+    """
+    analysis_types = COMBINED_ANALYSIS_TYPES if analysis_type == "combined" else [analysis_type]
+
+    def analyze(prepared):
+        revisions = {name: model_revision(name) for name in analysis_types}
+        names = [tweet_id_name(item["tweet"]) for item in prepared]
+        stored = stored_results(names, analysis_types, revisions)
+        results = [stored.get(name, {}) for name in names]
+        missing = [i for i, result in enumerate(results) if len(result) < len(analysis_types)]
+        if missing:
+            contents = [prepared[i]["content_for_analysis"] for i in missing]
+            if analysis_type == "combined":
+                fresh = score_tweets_combined(contents)
+            else:
+                fresh = [{analysis_type: scores} for scores in score_tweets(contents, analysis_type)]
+            for i, result in zip(missing, fresh):
+                results[i] = result
+        logger.debug(f"{len(prepared) - len(missing)} of {len(prepared)} tweets already had {analysis_type} results")
+        return [(item, result, revisions) for item, result in zip(prepared, results)]
+    return analyze
+
+
+def persist_batch(analyzed):
+    """Save analysed tweets in one upsert per set of changed fields, returning (Tweet, serialized data) pairs.
+
+    Only the fields this analysis produced are overwritten on conflict, so scores stored earlier
+    for other analysis types survive. A type whose scoring failed keeps its "NA" label and unset
+    scores on a new row, and whatever was stored before on an existing one.
+    """
+    rows = {}
+    for item, result, revisions in analyzed:
+        tweet_dict = item["tweet"]
+        tweet = Tweet(
+            tweet_id_name=tweet_id_name(tweet_dict),
+            handle=tweet_dict["handle"],
+            content=item["original_content"],
+            translated_content=item["translated_content"],
+            timestamp=tweet_dict["timestamp"],
+        )
+        update_fields = {"handle", "content", "translated_content", "timestamp"}
+        for name, scores in result.items():
+            if scores is None:
+                logger.error(f"No {name} scores for {tweet.tweet_id_name}, saving it without them")
+                continue
+            setattr(tweet, name, scores_to_label(name, scores))
+            setattr(tweet, f"{name}_scores", pack_scores(scores))
+            setattr(tweet, f"{name}_revision", revisions[name])
+            update_fields.update([name, f"{name}_scores", f"{name}_revision"])
+        # The same tweet twice in a batch would conflict with itself
+        rows[tweet.tweet_id_name] = (tweet, frozenset(update_fields))
+
+    groups = {}
+    for tweet, update_fields in rows.values():
+        groups.setdefault(update_fields, []).append(tweet)
+    with transaction.atomic():
+        for update_fields, tweets in groups.items():
+            Tweet.objects.bulk_create(
+                tweets,
+                update_conflicts=True,
+                unique_fields=["tweet_id_name"],
+                update_fields=sorted(update_fields)
+            )
+        # Read the rows back for their ids and any scores kept from earlier analyses
+        saved_rows = Tweet.objects.in_bulk(list(rows), field_name="tweet_id_name")
+
+    saved = []
+    for item, _, _ in analyzed:
+        tweet = saved_rows[tweet_id_name(item["tweet"])]
+        saved.append((tweet, TweetSerializer(tweet).data))
+    return saved
+
+
+def build_pipeline(analysis_type, on_progress=None):
+    workers = {**DEFAULT_STAGE_WORKERS, **getattr(settings, 'PIPELINE_STAGE_WORKERS', {})}
+    return Pipeline(
+        [
+            Stage("detect", detect_batch, workers["detect"]),
+            Stage("translate", translate_batch, workers["translate"]),
+            Stage("analyze", analyze_stage(analysis_type), workers["analyze"]),
+            Stage("persist", persist_batch, workers["persist"]),
+        ],
+        queue_size=getattr(settings, 'PIPELINE_QUEUE_SIZE', DEFAULT_PIPELINE_QUEUE_SIZE),
+        on_progress=on_progress
+    )
+
+
+def iter_analysis(analysis_type, max_tweets, username=None, hashtag=None, on_progress=None):
+    """Scrape a username or hashtag and analyse it, yielding (Tweet, serialized data) pairs a batch at a time."""
+    pipeline = build_pipeline(analysis_type, on_progress)
+    yield from pipeline.iter_run(scrape_batches(max_tweets, username, hashtag))
+
+
+def run_analysis(analysis_type, max_tweets, username=None, hashtag=None, on_progress=None):
+    """Scrape a username or hashtag and analyse it, returning the saved Tweets and their serialized data."""
+    saved = [pair for batch in iter_analysis(analysis_type, max_tweets, username, hashtag, on_progress) for pair in batch]
+    return [tweet for tweet, _ in saved], [data for _, data in saved]
+
+
+def save_search_history(user, analysis_type, tweets, username=None, hashtag=None):
+    Through = userSearchHistory.tweets.through
+    with transaction.atomic():
+        search_history = userSearchHistory.objects.create(
+            user=user,
+            search_query=username if username else hashtag,
+            search_type="username" if username else "hashtag",
+            analysis_type=analysis_type
+        )
+        # One insert into the through table instead of tweets.set()'s lookup and per-batch adds
+        Through.objects.bulk_create([
+            Through(usersearchhistory_id=search_history.id, tweet_id=tweet_id)
+            for tweet_id in dict.fromkeys(tweet.id for tweet in tweets)
+        ])
+    return search_history
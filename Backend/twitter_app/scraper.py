@@ -1,7 +1,10 @@
 import json
 import os
 import logging
-from time import sleep
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import quote
 from selenium import webdriver
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.firefox.options import Options as FirefoxOptions
@@ -10,63 +13,192 @@ from webdriver_manager.firefox import GeckoDriverManager
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from fake_headers import Headers
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+TWITTER_BASE_URL = "https://twitter.com"
 TWITTER_LOGIN_URL = "https://twitter.com/i/flow/login"
+TWITTER_HOME_URL = "https://twitter.com/home"
+AUTH_COOKIE = "auth_token"
+# Hosts serving media and tracking that the lean profile refuses to load; abs.twimg.com serves the app itself
+DEFAULT_BLOCKED_HOSTS = [
+    "pbs.twimg.com",
+    "video.twimg.com",
+    "ton.twimg.com",
+    "analytics.twitter.com",
+    "ads-twitter.com",
+    "ads-api.twitter.com",
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+]
+# Firefox prefs for the lean profile: no images, no autoplaying media, no downloaded fonts
+LEAN_PREFS = {
+    "permissions.default.image": 2,
+    "media.autoplay.default": 5,
+    "media.autoplay.blocking_policy": 2,
+    "media.mediasource.enabled": False,
+    "gfx.downloadable_fonts.enabled": False,
+    "browser.display.use_document_fonts": 0,
+    # Otherwise Firefox retries a host directly when its PAC proxy refuses, undoing the blocking
+    "network.proxy.failover_direct": False,
+}
+# Bytes transferred and load timings of the current page, from the Resource and Navigation Timing APIs.
+# Cross-origin responses without Timing-Allow-Origin report a transferSize of 0.
+PAGE_METRICS_SCRIPT = """
+const navigation = performance.getEntriesByType('navigation')[0];
+const resources = performance.getEntriesByType('resource');
+const hosts = {};
+for (const entry of resources) {
+    const host = new URL(entry.name).hostname;
+    hosts[host] = (hosts[host] || 0) + 1;
+}
+return {
+    requests: resources.length + (navigation ? 1 : 0),
+    hosts: hosts,
+    transfer_bytes: resources.reduce((total, entry) => total + (entry.transferSize || 0), navigation ? navigation.transferSize || 0 : 0),
+    dom_content_loaded_ms: navigation ? Math.round(navigation.domContentLoadedEventEnd) : null,
+    load_ms: navigation ? Math.round(navigation.loadEventEnd) : null
+};
+"""
+USERNAME_INPUT = "//input[@autocomplete='username']"
+PASSWORD_INPUT = "//input[@autocomplete='current-password']"
+HOME_LINK = "[data-testid='AppTabBar_Home_Link']"
+EMPTY_STATE = "[data-testid='emptyState']"
+TWEET_CARDS = '//article[@data-testid="tweet"]'
+TWEET_CARD_SELECTOR = 'article[data-testid="tweet"]'
+PAGE_STATE_SCRIPT = f"return [document.querySelectorAll('{TWEET_CARD_SELECTOR}').length, document.body.scrollHeight];"
+# Reads every card not extracted yet in one round trip and marks it, returning the tweets and the page state
+EXTRACT_SCRIPT = f"""
+const tweets = [];
+for (const card of document.querySelectorAll('{TWEET_CARD_SELECTOR}:not([data-scraped])')) {{
+    const time = card.querySelector('time');
+    const link = time && time.closest('a[href*="/status/"]');
+    const handle = Array.from(card.querySelectorAll('span')).find(span => span.textContent.startsWith('@'));
+    const text = card.querySelector('div[data-testid="tweetText"]');
+    // Cards still hydrating are left unmarked so a later pass picks them up once their text has rendered
+    if (!link || !handle || !text) continue;
+    card.setAttribute('data-scraped', '1');
+    tweets.push({{
+        tweet_id: link.getAttribute('href').split('/status/')[1].split(/[/?]/)[0],
+        handle: handle.textContent,
+        content: text.innerText,
+        timestamp: time.getAttribute('datetime')
+    }});
+}}
+return [tweets, [document.querySelectorAll('{TWEET_CARD_SELECTOR}').length, document.body.scrollHeight]];
+"""
 
-class Tweet:
-    def __init__(self, card, driver, username=None, is_hashtag=False):
-        self.tweet = None
-        self.error = False
+
+_cookie_lock = threading.Lock()
+
+
+def load_cookies(path):
+    """Saved session cookies, or None if there are none or the auth cookie has already expired."""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            cookies = json.load(f)
+    except (OSError, ValueError) as e:
+        logging.error(f"Error reading saved session cookies: {e}")
+        return None
+    auth = next((cookie for cookie in cookies if cookie.get("name") == AUTH_COOKIE), None)
+    if auth is None or auth.get("expiry", float("inf")) <= time.time():
+        return None
+    return cookies
+
+
+def save_cookies(path, cookies):
+    """Write the cookie jar atomically and readable only by this user, since it grants account access."""
+    with _cookie_lock:
+        temp_path = f"{path}.tmp"
+        with open(os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w", encoding="utf-8") as f:
+            json.dump(cookies, f)
+        os.replace(temp_path, path)
+
+
+def is_blocked(host, blocked_hosts):
+    return any(host == blocked or host.endswith(f".{blocked}") for blocked in blocked_hosts)
+
+
+def blocking_pac(hosts):
+    """Proxy auto-config script sending the given hosts (and their subdomains) to a closed local port."""
+    conditions = " || ".join(f'host == "{host}" || dnsDomainIs(host, ".{host}")' for host in hosts)
+    return (
+        "function FindProxyForURL(url, host) {"
+        f" if ({conditions}) return 'PROXY 127.0.0.1:9';"
+        " return 'DIRECT'; }"
+    )
+
+
+class PhaseTimer:
+    """Accumulates wall time per named phase, for logging where a scrape spends its time."""
+
+    def __init__(self):
+        self.durations = {}
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
         try:
-            handle = card.find_element("xpath", ".//span[starts-with(text(), '@')]").text
-            content = card.find_element("xpath", ".//div[@data-testid='tweetText']").text
-            # Collect all tweets for hashtag scraping, or filter by username for profile scraping
-            if is_hashtag or (handle == f"@{username}" and content):
-                self.tweet = {
-                    "content": content,
-                    "handle": handle,
-                    "timestamp": card.find_element("xpath", ".//time").get_attribute("datetime"),
-                    "tweet_id": card.find_element("xpath", ".//a[@href]").get_attribute("href").split("/")[-1]
-                }
-            else:
-                self.error = True
-        except (NoSuchElementException, StaleElementReferenceException):
-            self.error = True
-            logging.error("Error extracting tweet data")
+            yield
+        finally:
+            self.durations[name] = self.durations.get(name, 0.0) + time.perf_counter() - started
 
-class TwitterScraper:
-    _instance = None
+    def __str__(self):
+        return ", ".join(f"{name}={duration:.2f}s" for name, duration in self.durations.items())
+
+
+def keep_tweet(tweet, username=None, is_hashtag=False):
+    # Collect all tweets for hashtag scraping, or filter by username for profile scraping
+    return is_hashtag or (tweet["handle"] == f"@{username}" and tweet["content"])
+
+
+class ScraperUnavailable(RuntimeError):
+    """No scraper session could be checked out before the timeout."""
 
-    @classmethod
-    def get_instance(cls, mail=None, username=None, password=None):
-        """
-        Get the singleton instance of TwitterScraper, creating it if necessary.
-        """
-        if cls._instance is None:
-            if not all([mail, username, password]):
-                raise ValueError("Missing Twitter credentials for scraper initialization")
-            cls._instance = cls(mail, username, password)
-        return cls._instance
 
-    def __init__(self, mail, username, password):
+class TwitterScraper:
+    """One logged-in browser session. Sessions are handed out by ScraperPool, one request at a time."""
+    page_load_timeout = 15  # Seconds to wait for a page or login step to render
+    scroll_timeout = 4  # Seconds to wait for a scroll to render more tweets
+    max_idle_scrolls = 2  # Scrolls in a row that rendered nothing before assuming the timeline ended
+    poll_interval = 0.1
+    initial_scroll_step = 2000  # Pixels
+    min_scroll_step = 800
+    max_scroll_step = 6000
+    target_new_cards = 10  # Stay well inside the window of cards the timeline keeps rendered
+    session_check_timeout = 10  # Seconds for the home timeline to confirm restored cookies
+
+    def __init__(self, mail, username, password, cookie_path=None, lean=False, blocked_hosts=None,
+                 record_dir=None, record_snapshots=False):
         """
-        Initialize the scraper with credentials and log in to Twitter.
-        Raises RuntimeError if called directly instead of using get_instance().
+        Initialize the scraper, restoring the saved session from `cookie_path` if it is still
+        valid and logging in with the credentials otherwise. A `lean` browser skips images, media,
+        web fonts and the `blocked_hosts`, since scraping only reads text, times and ids.
+        With `record_dir` set, every scrape is saved there for ReplayScraper.
         """
-        if self._instance is not None:
-            raise RuntimeError("Use get_instance() to get the TwitterScraper instance")
+        self.record_dir = record_dir
+        self.record_snapshots = record_snapshots
         self.mail = mail
         self.username = username
         self.password = password
+        self.cookie_path = cookie_path
+        self.lean = lean
+        self.blocked_hosts = DEFAULT_BLOCKED_HOSTS if blocked_hosts is None else blocked_hosts
+        self.metrics = {}
         self.tweet_ids = set()
         self.data = []
+        self.created_at = time.monotonic()
+        self.stop_reason = None
+        self.logged_in = False
         self.driver = self._get_driver()
-        self.login()
+        if not self.restore_session():
+            self.login()
 
     def _get_driver(self):
         logging.info("Setting up WebDriver")
@@ -76,6 +208,16 @@ class TwitterScraper:
         options.add_argument("--no-sandbox")
         options.add_argument("--disable-dev-shm-usage")
         options.add_argument(f"--user-agent={header}")
+        if self.lean:
+            for name, value in LEAN_PREFS.items():
+                options.set_preference(name, value)
+            if self.blocked_hosts:
+                options.set_preference("network.proxy.type", 2)
+                options.set_preference(
+                    "network.proxy.autoconfig_url",
+                    "data:application/x-ns-proxy-autoconfig," + quote(blocking_pac(self.blocked_hosts))
+                )
+            logging.info("Using lean browser profile")
 
         gecko_path = os.path.join(os.path.dirname(__file__), "geckodriver")
         if os.path.exists(gecko_path):
@@ -89,85 +231,471 @@ class TwitterScraper:
         logging.info("WebDriver setup complete")
         return driver
 
+    def restore_session(self):
+        """Load saved cookies and check that they still open the home timeline."""
+        cookies = load_cookies(self.cookie_path)
+        if not cookies:
+            return False
+        logging.info("Restoring saved Twitter session...")
+        timer = PhaseTimer()
+        try:
+            with timer.phase("cookies"):
+                # Cookies can only be added for the domain currently loaded
+                self.driver.get(TWITTER_BASE_URL)
+                for cookie in cookies:
+                    try:
+                        self.driver.add_cookie(cookie)
+                    except WebDriverException:
+                        pass
+            with timer.phase("validate"):
+                self.driver.get(TWITTER_HOME_URL)
+                self._wait(self.session_check_timeout).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, HOME_LINK))
+                )
+        except TimeoutException:
+            logging.info(f"Saved session is no longer valid ({timer})")
+            self.driver.delete_all_cookies()
+            return False
+        except WebDriverException as e:
+            logging.error(f"Error restoring saved session: {e}")
+            return False
+        self.logged_in = True
+        logging.info(f"Restored saved session ({timer})")
+        return True
+
+    def save_session(self):
+        if self.cookie_path:
+            try:
+                save_cookies(self.cookie_path, self.driver.get_cookies())
+            except (OSError, WebDriverException) as e:
+                logging.error(f"Error saving session cookies: {e}")
+
     def login(self):
+        if not all([self.username, self.password]):
+            logging.error("Missing Twitter credentials and no valid saved session")
+            return
         logging.info("Logging in to Twitter...")
-        self.driver.get(TWITTER_LOGIN_URL)
-        sleep(3)
+        timer = PhaseTimer()
         try:
-            username_field = self.driver.find_element("xpath", "//input[@autocomplete='username']")
-            username_field.send_keys(self.username)
-            username_field.send_keys(Keys.RETURN)
-            sleep(3)
-            password_field = self.driver.find_element("xpath", "//input[@autocomplete='current-password']")
-            password_field.send_keys(self.password)
-            password_field.send_keys(Keys.RETURN)
-            sleep(3)
-            logging.info("Login Successful")
+            with timer.phase("load"):
+                self.driver.get(TWITTER_LOGIN_URL)
+                username_field = self._wait().until(EC.element_to_be_clickable((By.XPATH, USERNAME_INPUT)))
+            with timer.phase("username"):
+                username_field.send_keys(self.username)
+                username_field.send_keys(Keys.RETURN)
+                password_field = self._wait().until(EC.element_to_be_clickable((By.XPATH, PASSWORD_INPUT)))
+            with timer.phase("password"):
+                password_field.send_keys(self.password)
+                password_field.send_keys(Keys.RETURN)
+                self._wait().until(EC.any_of(
+                    EC.url_contains("/home"),
+                    EC.presence_of_element_located((By.CSS_SELECTOR, HOME_LINK))
+                ))
+            self.logged_in = True
+            logging.info(f"Login Successful ({timer})")
+            self.save_session()
         except Exception as e:
             logging.info(f"Login Failed: {e}")
             self.driver.quit()
 
+    def _wait(self, timeout=None):
+        return WebDriverWait(self.driver, timeout or self.page_load_timeout, poll_frequency=self.poll_interval)
+
+    def _wait_for_timeline(self):
+        """Wait until the first tweets (or an empty-results notice) have rendered."""
+        try:
+            self._wait().until(EC.any_of(
+                EC.presence_of_element_located((By.XPATH, TWEET_CARDS)),
+                EC.presence_of_element_located((By.CSS_SELECTOR, EMPTY_STATE))
+            ))
+        except TimeoutException:
+            logging.warning(f"No tweets rendered within {self.page_load_timeout}s")
+
     def go_to_profile(self, username):
         logging.info(f"Navigating to profile: {username}")
         self.driver.get(f"https://twitter.com/{username}")
-        sleep(1.5)
+        self._wait_for_timeline()
 
     def go_to_hashtag(self, hashtag, latest=True):
         logging.info(f"Navigating to hashtag: {hashtag}")
         url = f"https://twitter.com/hashtag/{hashtag}?src=hashtag_click" + ("&f=live" if latest else "")
         self.driver.get(url)
-        sleep(1.5)
+        self._wait_for_timeline()
 
-    def scrape_tweets(self, max_tweets=50, scrape_username=None, scrape_hashtag=None, scrape_latest=True):
-        logging.info("Starting tweet scraping")
-        self.tweet_ids.clear()
-        self.data.clear()
+    def _page_metrics(self):
+        try:
+            return self.driver.execute_script(PAGE_METRICS_SCRIPT)
+        except WebDriverException as e:
+            logging.error(f"Error reading page metrics: {e}")
+            return {}
 
+    def _open_target(self, scrape_username=None, scrape_hashtag=None, scrape_latest=True):
         if scrape_username:
             self.go_to_profile(scrape_username)
-        elif scrape_hashtag:
+        else:
             self.go_to_hashtag(scrape_hashtag, scrape_latest)
+        # The default buffer of 250 entries fills up within a few scrolls
+        self.driver.execute_script("performance.setResourceTimingBufferSize(10000);")
+
+    def _extract(self):
+        """Tweets on cards not extracted yet, and the page state to compare against after scrolling."""
+        return self.driver.execute_script(EXTRACT_SCRIPT)
+
+    def _scroll(self, step, page_state):
+        """Scroll down by `step` pixels; False if nothing new rendered in time."""
+        self.driver.execute_script("window.scrollBy(0, arguments[0]);", step)
+        return self._wait_for_more(page_state)
+
+    def _page_state(self):
+        return self.driver.execute_script(PAGE_STATE_SCRIPT)
+
+    def _wait_for_more(self, before):
+        """Wait until the scroll rendered more cards or grew the page; False if nothing changed in time."""
+        try:
+            self._wait(self.scroll_timeout).until(lambda driver: self._page_state() != before)
+            return True
+        except TimeoutException:
+            return False
+
+    def _next_scroll_step(self, step, new_cards):
+        """Scroll far enough to render about `target_new_cards` unseen cards, based on the density observed so far."""
+        if new_cards:
+            step = step * self.target_new_cards / new_cards
         else:
+            step = step * 2
+        return int(min(max(step, self.min_scroll_step), self.max_scroll_step))
+
+    def scrape_tweets(self, max_tweets=50, scrape_username=None, scrape_hashtag=None, scrape_latest=True,
+                      known_ids=None):
+        for _ in self.iter_tweets(max_tweets, scrape_username, scrape_hashtag, scrape_latest, known_ids):
+            pass
+        return self.data  # Return list of dictionaries instead of JSON
+
+    def iter_tweets(self, max_tweets=50, scrape_username=None, scrape_hashtag=None, scrape_latest=True,
+                    known_ids=None):
+        """Yield the tweets found on each scroll as a list, so callers can process them while scrolling continues.
+
+        Tweets in `known_ids` are already stored: they are skipped but count towards `max_tweets`, so the
+        caller can fill them in from the database. A scroll made up only of known tweets ends the scrape
+        once the known tweets are enough to make up the rest of `max_tweets`; otherwise scrolling goes on
+        past them. `stop_reason` tells why the scrape ended: "max_tweets", "known" or "end" (nothing more loaded).
+        """
+        logging.info("Starting tweet scraping")
+        self.tweet_ids.clear()
+        self.data.clear()
+        self.stop_reason = None
+        known_ids = known_ids or set()
+        timer = PhaseTimer()
+
+        if not (scrape_username or scrape_hashtag):
             logging.warning("No scrape target specified")
-            return []
+            return
+        with timer.phase("navigate"):
+            self._open_target(scrape_username, scrape_hashtag, scrape_latest)
+        recorder = ScrapeRecorder(self.record_dir, scrape_username, scrape_hashtag) if self.record_dir else None
 
-        last_height = self.driver.execute_script("return document.body.scrollHeight")
         scroll_attempts = 0
-        max_scroll_attempts = 5
-
-        while len(self.data) < max_tweets and scroll_attempts < max_scroll_attempts:
-            tweet_cards = self.driver.find_elements("xpath", '//article[@data-testid="tweet"]')
-            new_tweets_added = False
-
-            for card in tweet_cards[-20:]:
-                tweet_id = str(hash(card))
-                if tweet_id not in self.tweet_ids:
-                    self.tweet_ids.add(tweet_id)
-                    # Pass is_hashtag=True for hashtag scraping
-                    tweet = Tweet(card, self.driver, scrape_username, is_hashtag=bool(scrape_hashtag))
-                    if not tweet.error and tweet.tweet:
-                        self.data.append(tweet.tweet)
-                        new_tweets_added = True
-                        if len(self.data) >= max_tweets:
-                            break
-
-            if len(self.data) >= max_tweets:
+        max_scroll_attempts = self.max_idle_scrolls
+        scroll_step = self.initial_scroll_step
+        scrolls = 0
+
+        known_seen = 0  # Known tweets skipped so far
+
+        while len(self.data) + known_seen < max_tweets and scroll_attempts < max_scroll_attempts:
+            with timer.phase("extract"):
+                tweets, page_state = self._extract()
+                if recorder:
+                    recorder.add(tweets, self.driver.page_source if self.record_snapshots else None)
+                new_cards = 0
+                known_cards = 0
+                found = []
+
+                for tweet in tweets:
+                    # The timeline re-renders cards as it scrolls, so dedupe on the status id
+                    if tweet["tweet_id"] in self.tweet_ids:
+                        continue
+                    self.tweet_ids.add(tweet["tweet_id"])
+                    new_cards += 1
+                    if tweet["tweet_id"] in known_ids:
+                        known_cards += 1
+                        known_seen += 1
+                    elif keep_tweet(tweet, scrape_username, is_hashtag=bool(scrape_hashtag)):
+                        self.data.append(tweet)
+                        found.append(tweet)
+                    if len(self.data) + known_seen >= max_tweets:
+                        break
+
+            if found:
+                yield found
+            if len(self.data) + known_seen >= max_tweets:
+                self.stop_reason = "max_tweets"
+                break
+            # Older tweets than the stored ones are only needed if the stored ones can't make up the rest
+            if known_cards and known_cards == new_cards and len(self.data) + len(known_ids) >= max_tweets:
+                logging.info("Reached tweets scraped previously")
+                self.stop_reason = "known"
                 break
 
-            self.driver.execute_script("window.scrollBy(0, 2000);")
-            sleep(1.5)
-            new_height = self.driver.execute_script("return document.body.scrollHeight")
-            if new_height == last_height and not new_tweets_added:
+            if scrolls:
+                scroll_step = self._next_scroll_step(scroll_step, new_cards)
+            with timer.phase("scroll"):
+                changed = self._scroll(scroll_step, page_state)
+                scrolls += 1
+            if not changed and not new_cards:
                 scroll_attempts += 1
                 logging.info(f"No new tweets, attempt {scroll_attempts}/{max_scroll_attempts}")
             else:
                 scroll_attempts = 0
-                last_height = new_height
 
-        logging.info(f"Scraped {len(self.data)} tweets")
-        print(self.data)
-        return self.data  # Return list of dictionaries instead of JSON
+        if self.stop_reason is None:
+            self.stop_reason = "end" if scroll_attempts >= max_scroll_attempts else "max_tweets"
+        if recorder:
+            recorder.save()
+        self.metrics = {"scrolls": scrolls, "phases": dict(timer.durations), **self._page_metrics()}
+        # Requests that reached a blocked host; stays 0 while the PAC blocking holds
+        self.metrics["blocked_requests"] = sum(
+            count for host, count in self.metrics.get("hosts", {}).items()
+            if is_blocked(host, self.blocked_hosts)
+        )
+        logging.info(
+            f"Scraped {len(self.data)} tweets in {scrolls} scrolls ({timer}); "
+            f"{self.metrics.get('requests')} requests, {(self.metrics.get('transfer_bytes') or 0) / 1024:.0f} KiB transferred, "
+            f"{self.metrics['blocked_requests']} to blocked hosts, page load {self.metrics.get('load_ms')} ms"
+        )
+
+    def age(self):
+        return time.monotonic() - self.created_at
+
+    def is_healthy(self):
+        """Check that the browser still answers, not just that the geckodriver port is open."""
+        if not self.logged_in:
+            return False
+        try:
+            if not self.driver.service.is_connectable():
+                return False
+            self.driver.execute_script("return document.readyState")
+            return True
+        except WebDriverException:
+            return False
 
     def quit(self):
         logging.info("Quitting WebDriver")
-        self.driver.quit()
\ No newline at end of file
+        try:
+            self.driver.quit()
+        except WebDriverException as e:
+            logging.error(f"Error quitting WebDriver: {e}")
+
+
+def recording_path(directory, scrape_username=None, scrape_hashtag=None):
+    if scrape_username:
+        name = f"username-{scrape_username.lstrip('@')}"
+    else:
+        name = f"hashtag-{scrape_hashtag.lstrip('#')}"
+    return os.path.join(directory, f"{name.lower()}.json")
+
+
+class ScrapeRecorder:
+    """Saves the cards extracted on each scroll, with their time since the scrape started, for replay."""
+
+    def __init__(self, directory, scrape_username=None, scrape_hashtag=None):
+        os.makedirs(directory, exist_ok=True)
+        self.path = recording_path(directory, scrape_username, scrape_hashtag)
+        self.target = {"username": scrape_username, "hashtag": scrape_hashtag}
+        self.started = time.monotonic()
+        self.batches = []
+
+    def add(self, tweets, snapshot=None):
+        batch = {"offset": round(time.monotonic() - self.started, 3), "tweets": tweets}
+        if snapshot is not None:
+            snapshot_path = f"{self.path[:-len('.json')]}-{len(self.batches)}.html"
+            with open(snapshot_path, "w", encoding="utf-8") as f:
+                f.write(snapshot)
+            batch["snapshot"] = os.path.basename(snapshot_path)
+        self.batches.append(batch)
+
+    def save(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"target": self.target, "recorded_at": time.time(), "batches": self.batches}, f, indent=1)
+        logging.info(f"Recorded {len(self.batches)} scrolls to {self.path}")
+
+
+class ReplayScraper(TwitterScraper):
+    """Serves scrapes from ScrapeRecorder recordings instead of a browser, for offline tests and benchmarks.
+
+    Each recorded scroll is returned after `latency` seconds, or after the recorded delay when
+    `latency` is None. Filtering, deduplication and stopping behave exactly as for a live scrape.
+    """
+
+    def __init__(self, mail=None, username=None, password=None, recordings_dir=None, latency=None, **options):
+        self.mail = mail
+        self.username = username
+        self.password = password
+        self.recordings_dir = recordings_dir
+        self.latency = latency
+        self.blocked_hosts = []
+        self.record_dir = None
+        self.record_snapshots = False
+        self.tweet_ids = set()
+        self.data = []
+        self.metrics = {}
+        self.created_at = time.monotonic()
+        self.stop_reason = None
+        self.logged_in = True
+        self.driver = None
+        self._batches = []
+        self._cursor = 0
+        self._last_offset = 0.0
+
+    def _open_target(self, scrape_username=None, scrape_hashtag=None, scrape_latest=True):
+        path = recording_path(self.recordings_dir, scrape_username, scrape_hashtag)
+        try:
+            with open(path, encoding="utf-8") as f:
+                self._batches = json.load(f)["batches"]
+        except OSError:
+            logging.warning(f"No recording at {path}")
+            self._batches = []
+        self._cursor = 0
+        self._last_offset = 0.0
+
+    def _extract(self):
+        if self._cursor >= len(self._batches):
+            return [], self._cursor
+        batch = self._batches[self._cursor]
+        delay = self.latency if self.latency is not None else batch["offset"] - self._last_offset
+        self._last_offset = batch["offset"]
+        if delay > 0:
+            time.sleep(delay)
+        self._cursor += 1
+        return batch["tweets"], self._cursor
+
+    def _scroll(self, step, page_state):
+        return self._cursor < len(self._batches)
+
+    def _page_metrics(self):
+        return {}
+
+    def is_healthy(self):
+        return True
+
+    def quit(self):
+        pass
+
+
+class ScraperPool:
+    """Keeps up to `size` logged-in scraper sessions and lends each to one request at a time.
+
+    Sessions are started on the first checkout that needs one, reusing the saved cookies where
+    possible, health-checked on checkout and replaced once they are older than `max_age` seconds. When every session is busy, checkout waits for one to be checked in.
+    """
+
+    def __init__(self, mail, username, password, size=2, max_age=None, checkout_timeout=120,
+                 scraper_class=None, **scraper_options):
+        self.mail = mail
+        self.username = username
+        self.password = password
+        self.scraper_class = scraper_class or TwitterScraper
+        self.scraper_options = scraper_options  # Passed on to the scraper, e.g. cookie_path or lean=True
+        self.size = size
+        self.max_age = max_age
+        self.checkout_timeout = checkout_timeout
+        self._idle = []
+        self._sessions = 0  # Idle, checked out or starting
+        self._condition = threading.Condition()
+
+    def _create(self):
+        return self.scraper_class(self.mail, self.username, self.password, **self.scraper_options)
+
+    def start(self, count=1):
+        """Log in `count` sessions ahead of the first request."""
+        for _ in range(count):
+            with self._condition:
+                if self._sessions >= self.size:
+                    return
+                self._sessions += 1
+            self.checkin(self._start_session())
+
+    def _start_session(self):
+        try:
+            scraper = self._create()
+            if not scraper.logged_in:
+                scraper.quit()
+                raise ScraperUnavailable("Could not log in to Twitter")
+            return scraper
+        except Exception:
+            with self._condition:
+                self._sessions -= 1
+                self._condition.notify()
+            raise
+
+    def _usable(self, scraper):
+        if self.max_age is not None and scraper.age() > self.max_age:
+            logging.info("Recycling scraper session that reached its maximum age")
+            return False
+        if not scraper.is_healthy():
+            logging.warning("Scraper session expired, reinitializing...")
+            return False
+        return True
+
+    def checkout(self, timeout=None):
+        """Take an idle healthy session, start a new one if below `size`, or wait for one to be returned."""
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._condition:
+                while not self._idle and self._sessions >= self.size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise ScraperUnavailable(f"All {self.size} scraper sessions are busy")
+                    self._condition.wait(remaining)
+                if self._idle:
+                    scraper = self._idle.pop()
+                else:
+                    self._sessions += 1
+                    scraper = None
+
+            if scraper is None:
+                return self._start_session()
+            if self._usable(scraper):
+                return scraper
+            self.discard(scraper)
+
+    def checkin(self, scraper):
+        scraper.tweet_ids.clear()
+        scraper.data.clear()
+        with self._condition:
+            self._idle.append(scraper)
+            self._condition.notify()
+
+    def discard(self, scraper):
+        """Quit a session instead of returning it, freeing its slot for a fresh one."""
+        scraper.quit()
+        with self._condition:
+            self._sessions -= 1
+            self._condition.notify()
+
+    @contextmanager
+    def session(self, timeout=None):
+        scraper = self.checkout(timeout)
+        try:
+            yield scraper
+        except Exception:
+            # A failed scrape may have left the browser in a bad state
+            if scraper.is_healthy():
+                self.checkin(scraper)
+            else:
+                self.discard(scraper)
+            raise
+        self.checkin(scraper)
+
+    def status(self):
+        with self._condition:
+            return {"size": self.size, "sessions": self._sessions, "idle": len(self._idle)}
+
+    def close(self):
+        with self._condition:
+            idle, self._idle = self._idle, []
+        for scraper in idle:
+            self.discard(scraper)
+
+
+SCRAPER_BACKENDS = {"selenium": TwitterScraper, "replay": ReplayScraper}
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Tweet
+from .models import Tweet, ANALYSIS_LABELS
 
 # class AnalysisResultSerializer(serializers.ModelSerializer):
 #     class Meta:
@@ -7,6 +7,14 @@ from .models import Tweet
 #         fields = ['sentiment_score', 'toxicity_score', 'emotion_score']
 
 class TweetSerializer(serializers.ModelSerializer):
+    scores = serializers.SerializerMethodField()
+
     class Meta:
         model = Tweet
-        fields = ['handle', 'content','translated_content', 'sentiment', 'toxicity', 'emotion','timestamp']
\ No newline at end of file
+        fields = ['handle', 'content','translated_content', 'sentiment', 'toxicity', 'emotion','timestamp', 'scores']
+
+    def get_scores(self, obj):
+        return {
+            analysis_type: obj.get_scores(analysis_type)
+            for analysis_type in ANALYSIS_LABELS
+        }
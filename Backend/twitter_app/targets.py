@@ -0,0 +1,82 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ScrapeTarget, Tweet
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SCRAPE_CACHE_TTL = 600  # Seconds
+DEFAULT_SCRAPE_TARGET_HISTORY = 500  # Recent tweets remembered per target
+
+
+def tweet_id_name(tweet_dict):
+    return f"{tweet_dict['tweet_id']}_{tweet_dict['timestamp']}"
+
+
+def get_scrape_target(username=None, hashtag=None):
+    if username:
+        target_type, target = "username", username.lstrip("@").lower()
+    else:
+        target_type, target = "hashtag", hashtag.lstrip("#").lower()
+    scrape_target, _ = ScrapeTarget.objects.get_or_create(target_type=target_type, target=target)
+    return scrape_target
+
+
+def known_tweet_ids(scrape_target):
+    # The timestamp part of tweet_id_name never contains an underscore
+    return {name.rsplit("_", 1)[0] for name in scrape_target.recent_tweets}
+
+
+def stored_tweets(scrape_target, limit, exclude=()):
+    """The target's most recent stored tweets, newest first, as dicts shaped like the scraper's output."""
+    names = [name for name in scrape_target.recent_tweets if name not in exclude][:limit]
+    rows = {tweet.tweet_id_name: tweet for tweet in Tweet.objects.filter(tweet_id_name__in=names)}
+    return [
+        {
+            "content": rows[name].content,
+            "handle": rows[name].handle,
+            "timestamp": rows[name].timestamp,
+            "tweet_id": name[:-len(rows[name].timestamp) - 1],
+        }
+        for name in names if name in rows
+    ]
+
+
+def cached_tweets(scrape_target, max_tweets):
+    """Stored tweets that can answer a search without scraping, or None if the target must be scraped."""
+    ttl = getattr(settings, 'SCRAPE_CACHE_TTL', DEFAULT_SCRAPE_CACHE_TTL)
+    if not ttl or scrape_target.last_scraped_at is None:
+        return None
+    if timezone.now() - scrape_target.last_scraped_at > timedelta(seconds=ttl):
+        return None
+    wanted = min(max_tweets, len(scrape_target.recent_tweets)) if scrape_target.exhausted else max_tweets
+    if len(scrape_target.recent_tweets) < wanted:
+        return None
+    tweets = stored_tweets(scrape_target, max_tweets)
+    # Rows can be missing if the request that scraped them failed before saving
+    if len(tweets) < wanted:
+        return None
+    return tweets
+
+
+def record_scrape(scrape_target, tweets, exhausted):
+    """Merge freshly scraped tweets into the target's history.
+
+    The row is locked before it is re-read, so concurrent scrapes of one target don't drop each other's tweets.
+    """
+    with transaction.atomic():
+        # Writing first takes the lock on every backend: the row lock, or SQLite's write lock, which
+        # a transaction that read first could only upgrade to by failing with "database is locked"
+        ScrapeTarget.objects.filter(pk=scrape_target.pk).update(last_scraped_at=timezone.now(), exhausted=exhausted)
+        locked = ScrapeTarget.objects.get(pk=scrape_target.pk)
+        names = list(dict.fromkeys([tweet_id_name(tweet) for tweet in tweets] + locked.recent_tweets))
+        names.sort(key=lambda name: name.rsplit("_", 1)[-1], reverse=True)
+        locked.recent_tweets = names[:getattr(settings, 'SCRAPE_TARGET_HISTORY', DEFAULT_SCRAPE_TARGET_HISTORY)]
+        locked.save(update_fields=["recent_tweets"])
+    scrape_target.recent_tweets = locked.recent_tweets
+    scrape_target.last_scraped_at = locked.last_scraped_at
+    scrape_target.exhausted = locked.exhausted
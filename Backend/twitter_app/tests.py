@@ -1,3 +1,666 @@
-from django.test import TestCase
+import json
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from multiprocessing.connection import Listener
+from unittest import mock
 
-# Create your tests here.
+import torch
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from . import jobs, langid, pipeline, translation
+from .analyzer import COMBINED_ANALYSIS_TYPES, AnalyzerFactory, BaseAnalyzer, CombinedAnalyzer, InferenceScheduler, model_revision, preprocess
+from .apps import start_warm_up
+from .management.commands.benchmark_analyzers import DEFAULT_SAMPLE, build_tiny_model, build_tiny_tokenizer
+from .cache import AnalysisCache, DiskCache, LRUCache
+from .langid import identify_language, identify_languages
+from .management.commands.fake_translation_server import make_server
+from .models import ANALYSIS_LABELS, AnalysisJob, ScrapeTarget, Tweet, User, pack_scores, userSearchHistory
+from .pipeline import Pipeline, Stage, iter_analysis, run_analysis
+from .scraper import ReplayScraper, ScraperPool, ScraperUnavailable
+from .targets import get_scrape_target, record_scrape
+from .translation import GoogleTranslatorBackend, HTTPTranslatorBackend, LocalTranslatorBackend, TranslationService
+from .workers import InferenceWorkerPool, PoolAnalyzer
+
+
+def wait_until(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def use_temporary_analysis_cache(test):
+    """Point the analysis cache at an empty file for the rest of the test, instead of the shared one in BASE_DIR."""
+    directory = tempfile.mkdtemp()
+    test.addCleanup(shutil.rmtree, directory)
+    settings_override = override_settings(ANALYSIS_CACHE_PATH=os.path.join(directory, "analysis_cache.sqlite3"))
+    settings_override.enable()
+    test.addCleanup(settings_override.disable)
+    patch = mock.patch.object(AnalyzerFactory, "_cache", None)  # Built again from the overridden settings
+    patch.start()
+    test.addCleanup(patch.stop)
+
+
+class PipelineTests(SimpleTestCase):
+    def test_outputs_keep_source_order_with_several_workers(self):
+        def shuffle_timing(batch):
+            time.sleep(random.random() * 0.02)
+            return [item * 2 for item in batch]
+
+        pipeline = Pipeline([Stage("double", shuffle_timing, workers=4), Stage("copy", list, workers=3)], queue_size=2)
+        outputs = pipeline.run([i, i] for i in range(20))
+
+        self.assertEqual(outputs, [[i * 2, i * 2] for i in range(20)])
+        self.assertEqual(pipeline.progress, {"source": 40, "double": 40, "copy": 40})
+
+    def test_stage_error_is_reraised(self):
+        def fail_on_third(batch):
+            if batch == [3]:
+                raise ValueError("bad batch")
+            return batch
+
+        pipeline = Pipeline([Stage("check", fail_on_third, workers=2)])
+        with self.assertRaisesMessage(ValueError, "bad batch"):
+            pipeline.run([i] for i in range(100))
+
+    def test_source_error_is_reraised(self):
+        def source():
+            yield [1]
+            raise RuntimeError("scrape failed")
+
+        with self.assertRaisesMessage(RuntimeError, "scrape failed"):
+            Pipeline([Stage("copy", list)]).run(source())
+
+    def test_closing_early_stops_the_source(self):
+        closed = threading.Event()
+
+        def source():
+            try:
+                for i in range(1000):
+                    yield [i]
+            finally:
+                closed.set()
+
+        outputs = Pipeline([Stage("copy", list)], queue_size=1).iter_run(source())
+        self.assertEqual(next(outputs), [0])
+        outputs.close()
+        self.assertTrue(closed.wait(2))
+
+
+class AnalysisCacheTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, "cache.sqlite3")
+
+    def key(self, content):
+        return AnalysisCache.make_key("model", "rev", content)
+
+    def test_lru_evicts_the_least_recently_used_entry(self):
+        cache = LRUCache(max_size=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual((cache.get("a"), cache.get("c")), (1, 3))
+        self.assertEqual(cache.evictions, 1)
+
+    def test_disk_tier_serves_entries_evicted_from_memory(self):
+        cache = AnalysisCache(memory_size=1, disk_path=self.path)
+        cache.set_many({self.key("first"): [0.1, 0.9], self.key("second"): [0.8, 0.2]})
+
+        self.assertEqual(cache.get_many([self.key("first")]), {self.key("first"): [0.1, 0.9]})
+        self.assertEqual(cache.get_many([self.key("first"), self.key("missing")]), {self.key("first"): [0.1, 0.9]})
+        self.assertEqual(AnalysisCache(disk_path=self.path).get_many([self.key("second")]), {self.key("second"): [0.8, 0.2]})
+        self.assertEqual(
+            {name: cache.stats()[name] for name in ("memory_hits", "disk_hits", "misses")},
+            {"memory_hits": 1, "disk_hits": 1, "misses": 1}
+        )
+
+    def test_disk_tier_drops_the_oldest_rows_beyond_its_size(self):
+        disk = DiskCache(self.path, max_rows=3)
+        for i in range(5):
+            with mock.patch("twitter_app.cache.time.time", return_value=1000 + i):
+                disk.set_many({self.key(f"text {i}"): [i]})
+
+        self.assertEqual(disk.prune(), 2)
+        found = disk.get_many([self.key(f"text {i}") for i in range(5)])
+        self.assertEqual(sorted(found.values()), [[2], [3], [4]])
+        self.assertEqual(disk.evictions, 2)
+
+
+class InferenceSchedulerTests(SimpleTestCase):
+    def test_scores_match_direct_scoring_and_texts_are_tokenized_once(self):
+        with open(DEFAULT_SAMPLE, encoding='utf-8') as f:
+            contents = [preprocess(row['text']) for row in json.load(f)]
+        tokenizer = build_tiny_tokenizer(contents)
+        model = build_tiny_model(len(tokenizer), len(ANALYSIS_LABELS["sentiment"]))
+        analyzer = AnalyzerFactory._analyzer_classes["sentiment"].from_components(model, tokenizer)
+        expected = analyzer.score_batch(contents, batch_size=len(contents))
+
+        scheduler = InferenceScheduler(analyzer, max_batch_size=4, max_wait_ms=50)
+        with mock.patch.object(analyzer, "tokenize", wraps=analyzer.tokenize) as tokenize:
+            scores = [future.result(timeout=10) for future in scheduler.submit(contents)]
+
+        # Each text is tokenized once, however the dispatcher split the submissions
+        self.assertEqual(sum(len(call.args[0]) for call in tokenize.call_args_list), len(contents))
+        for item_scores, expected_scores in zip(scores, expected):
+            for score, expected_score in zip(item_scores, expected_scores):
+                self.assertAlmostEqual(score, expected_score, places=5)
+
+
+class LanguageIdentificationTests(SimpleTestCase):
+    def test_plain_english_skips_the_detector(self):
+        with mock.patch.object(langid, "detect_fallback", side_effect=AssertionError("detector called")):
+            languages = identify_languages([
+                "I think this is the best day of the year",
+                "@friend what do you want to get today? https://t.co/abc #weekend",
+            ])
+        self.assertEqual(languages, ["en", "en"])
+
+    def test_single_language_scripts_map_straight_to_their_language(self):
+        with mock.patch.object(langid, "detect_fallback", side_effect=AssertionError("detector called")):
+            languages = identify_languages(["आज मौसम बहुत अच्छा है", "今天天气很好", "今日はいい天気ですね"])
+        self.assertEqual(languages, ["hi", "zh-cn", "ja"])
+
+    def test_accented_latin_uses_the_seeded_detector(self):
+        text = "Hola amigos, ¿cómo están? Qué día tan bonito para ir a la playa"
+        with mock.patch.object(langid, "detect_fallback", wraps=langid.detect_fallback) as fallback:
+            first = identify_language(text)
+            second = identify_language(text)
+        self.assertEqual(fallback.call_count, 2)
+        self.assertEqual(first, "es")
+        self.assertEqual(second, first)
+
+    def test_text_without_letters_is_unknown(self):
+        self.assertEqual(identify_languages(["", "😂🔥🙌", "https://t.co/xyz", "@someone 123"]), ["unknown"] * 4)
+        self.assertEqual(identify_languages([]), [])
+
+
+class StubScraper:
+    """Stands in for a browser session in ScraperPool tests."""
+    fail_login = False
+
+    def __init__(self, mail, username, password, **options):
+        self.logged_in = not self.fail_login
+        self.healthy = True
+        self.quit_called = False
+        self.tweet_ids = set()
+        self.data = []
+        self.created_at = time.monotonic()
+
+    def age(self):
+        return time.monotonic() - self.created_at
+
+    def is_healthy(self):
+        return self.healthy
+
+    def quit(self):
+        self.quit_called = True
+
+
+class ScraperPoolTests(SimpleTestCase):
+    def make_pool(self, **options):
+        return ScraperPool("mail", "user", "password", scraper_class=StubScraper, **options)
+
+    def test_checked_in_session_is_reused(self):
+        pool = self.make_pool(size=2)
+        with pool.session() as scraper:
+            pass
+        with pool.session() as again:
+            self.assertIs(again, scraper)
+        self.assertEqual(pool.status(), {"size": 2, "sessions": 1, "idle": 1})
+
+    def test_checkout_times_out_when_all_sessions_are_busy(self):
+        pool = self.make_pool(size=1)
+        pool.checkout()
+        with self.assertRaises(ScraperUnavailable):
+            pool.checkout(timeout=0.05)
+
+    def test_waiting_checkout_gets_the_returned_session(self):
+        pool = self.make_pool(size=1)
+        scraper = pool.checkout()
+        threading.Timer(0.05, pool.checkin, args=[scraper]).start()
+        self.assertIs(pool.checkout(timeout=2), scraper)
+
+    def test_old_and_unhealthy_sessions_are_replaced(self):
+        pool = self.make_pool(size=1, max_age=60)
+        scraper = pool.checkout()
+        pool.checkin(scraper)
+        scraper.created_at -= 120
+        replacement = pool.checkout()
+        self.assertIsNot(replacement, scraper)
+        self.assertTrue(scraper.quit_called)
+
+        replacement.healthy = False
+        pool.checkin(replacement)
+        self.assertIsNot(pool.checkout(), replacement)
+        self.assertTrue(replacement.quit_called)
+        self.assertEqual(pool.status()["sessions"], 1)
+
+    def test_failed_login_frees_the_slot(self):
+        pool = self.make_pool(size=1)
+        with mock.patch.object(StubScraper, "fail_login", True):
+            with self.assertRaises(ScraperUnavailable):
+                pool.checkout()
+        self.assertEqual(pool.status()["sessions"], 0)
+        self.assertTrue(pool.checkout().logged_in)
+
+
+@override_settings(SCRAPE_CACHE_TTL=0)
+class ReplayPipelineTestCase(TransactionTestCase):
+    """Runs the whole pipeline on the recorded #sample scrape with small local models and no network."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        with open(DEFAULT_SAMPLE, encoding='utf-8') as f:
+            sample = [row['text'] for row in json.load(f)]
+        cls.registered = dict(AnalyzerFactory._analyzers)
+        for analysis_type in COMBINED_ANALYSIS_TYPES:
+            tokenizer = build_tiny_tokenizer(sample)
+            model = build_tiny_model(len(tokenizer), len(ANALYSIS_LABELS[analysis_type]))
+            analyzer_class = AnalyzerFactory._analyzer_classes[analysis_type]
+            AnalyzerFactory.register(analysis_type, analyzer_class.from_components(model, tokenizer))
+
+    @classmethod
+    def tearDownClass(cls):
+        AnalyzerFactory._analyzers = cls.registered
+        super().tearDownClass()
+
+    def setUp(self):
+        use_temporary_analysis_cache(self)
+        self.pool = ScraperPool(
+            None, None, None, size=1, scraper_class=ReplayScraper,
+            recordings_dir=settings.SCRAPER_REPLAY_DIR, latency=0.02
+        )
+        patches = [
+            mock.patch.object(pipeline, "SCRAPER_POOL", self.pool),
+            mock.patch.object(translation, "_translation_service", TranslationService(backend=LocalTranslatorBackend())),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+
+class AnalysisPipelineTests(ReplayPipelineTestCase):
+    def test_combined_scores_match_the_single_analyzers(self):
+        with open(DEFAULT_SAMPLE, encoding='utf-8') as f:
+            texts = [row['text'] for row in json.load(f)]
+        threads = torch.get_num_threads()
+        combined = CombinedAnalyzer()
+        self.addCleanup(combined.shutdown)
+
+        results = combined.score_batch(texts, batch_size=8)
+
+        self.assertEqual(torch.get_num_threads(), threads)
+        for analysis_type in COMBINED_ANALYSIS_TYPES:
+            single = AnalyzerFactory.get_analyzer(analysis_type).score_batch(texts, batch_size=8)
+            for result, expected in zip(results, single):
+                for score, expected_score in zip(result[analysis_type], expected):
+                    self.assertAlmostEqual(score, expected_score, places=5)
+
+    def test_recorded_tweets_are_scored_and_saved(self):
+        tweets, data = run_analysis("combined", 12, hashtag="sample")
+
+        self.assertEqual(len(tweets), 12)
+        self.assertEqual(Tweet.objects.count(), 12)
+        for tweet, item in zip(tweets, data):
+            self.assertEqual(item["content"], tweet.content)
+            for analysis_type in COMBINED_ANALYSIS_TYPES:
+                self.assertIn(getattr(tweet, analysis_type), ANALYSIS_LABELS[analysis_type])
+                self.assertEqual(getattr(tweet, f"{analysis_type}_revision"), model_revision(analysis_type))
+
+    def test_upsert_keeps_scores_from_other_analysis_types(self):
+        run_analysis("sentiment", 5, hashtag="sample")
+        sentiment = dict(Tweet.objects.values_list("tweet_id_name", "sentiment_scores"))
+        tweets, _ = run_analysis("toxicity", 5, hashtag="sample")
+
+        self.assertEqual(Tweet.objects.count(), 5)
+        for tweet in tweets:
+            self.assertEqual(bytes(tweet.sentiment_scores), bytes(sentiment[tweet.tweet_id_name]))
+            self.assertIsNotNone(tweet.get_scores("toxicity"))
+            self.assertEqual(tweet.emotion, "NA")
+
+    def test_failed_scoring_saves_the_tweets_without_scores(self):
+        run_analysis("toxicity", 5, hashtag="sample")
+        toxicity = dict(Tweet.objects.values_list("tweet_id_name", "toxicity_scores"))
+        with mock.patch.object(BaseAnalyzer, "predict", side_effect=RuntimeError("model exploded")):
+            tweets, _ = run_analysis("combined", 8, hashtag="sample")
+
+        self.assertEqual(len(tweets), 8)
+        for tweet in tweets:
+            self.assertEqual((tweet.sentiment, tweet.emotion), ("NA", "NA"))
+            self.assertIsNone(tweet.sentiment_scores)
+            self.assertIsNone(tweet.sentiment_revision)
+            if tweet.tweet_id_name in toxicity:
+                self.assertEqual(bytes(tweet.toxicity_scores), bytes(toxicity[tweet.tweet_id_name]))
+            else:
+                self.assertEqual(tweet.toxicity, "NA")
+
+    def test_stored_scores_skip_the_model(self):
+        first, _ = run_analysis("sentiment", 10, hashtag="sample")
+        with mock.patch.object(pipeline, "score_tweets", side_effect=AssertionError("model called")):
+            second, _ = run_analysis("sentiment", 10, hashtag="sample")
+        self.assertEqual({tweet.id for tweet in second}, {tweet.id for tweet in first})
+
+    def test_later_search_can_return_more_than_the_first_scrape(self):
+        run_analysis("sentiment", 10, hashtag="sample")
+        tweets, _ = run_analysis("sentiment", 30, hashtag="sample")
+        self.assertEqual(len({tweet.id for tweet in tweets}), 30)
+
+    def test_closing_the_stream_returns_the_scraper_session(self):
+        batches = iter_analysis("sentiment", 30, hashtag="sample")
+        self.assertTrue(next(batches))
+        batches.close()
+        self.assertTrue(wait_until(lambda: self.pool.status()["idle"] == 1))
+
+    def test_analysis_error_is_reraised_and_session_returned(self):
+        with mock.patch.object(pipeline, "score_tweets", side_effect=RuntimeError("model exploded")):
+            with self.assertRaisesMessage(RuntimeError, "model exploded"):
+                run_analysis("sentiment", 30, hashtag="sample")
+        self.assertTrue(wait_until(lambda: self.pool.status()["idle"] == 1))
+
+
+class ScrapeTargetTests(TestCase):
+    def tweet(self, tweet_id, timestamp):
+        return {"tweet_id": tweet_id, "timestamp": timestamp, "handle": "@a", "content": "hi"}
+
+    def test_concurrent_scrapes_keep_each_others_tweets(self):
+        target = get_scrape_target(hashtag="#Sample")
+        stale = ScrapeTarget.objects.get(pk=target.pk)
+
+        record_scrape(target, [self.tweet("1", "2026-10-18T10:00:00.000Z")], exhausted=False)
+        record_scrape(stale, [self.tweet("2", "2026-10-18T11:00:00.000Z")], exhausted=True)
+
+        target.refresh_from_db()
+        self.assertEqual(target.recent_tweets, ["2_2026-10-18T11:00:00.000Z", "1_2026-10-18T10:00:00.000Z"])
+        self.assertTrue(target.exhausted)
+        self.assertEqual(stale.recent_tweets, target.recent_tweets)
+
+
+class TranslationServiceTests(TestCase):
+    def setUp(self):
+        self.backend = mock.Mock()
+        self.backend.translate_batch.side_effect = lambda texts: [f"[en] {text}" for text in texts]
+        self.service = TranslationService(backend=self.backend)
+        Tweet.objects.create(tweet_id_name="@a-1", handle="@a", content="hola amigos", translated_content="hello friends")
+
+    def test_stored_translation_is_reused_by_tweet_name(self):
+        self.assertEqual(self.service.translate_to_english(["hola amigos"], ["es"], ["@a-1"]), ["hello friends"])
+        self.backend.translate_batch.assert_not_called()
+
+    def test_other_tweets_with_the_same_text_are_translated(self):
+        self.assertEqual(self.service.translate_to_english(["hola amigos"], ["es"], ["@b-2"]), ["[en] hola amigos"])
+
+
+class HTTPTranslatorBackendTests(TestCase):
+    """Runs the "http" translator backend against the fake LibreTranslate server."""
+
+    def start_server(self, **options):
+        server = make_server(**options)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def make_backend(self, server, **options):
+        options.setdefault("rate_limit", 1000)
+        backend = HTTPTranslatorBackend(url=f"http://127.0.0.1:{server.server_address[1]}", **options)
+        self.addCleanup(backend.executor.shutdown)
+        return backend
+
+    def test_rate_limited_requests_are_retried_after_retry_after(self):
+        server = self.start_server(latency_ms=100, max_in_flight=1)
+        backend = self.make_backend(server, concurrency=3, max_retries=3)
+        texts = [f"texto {i}" for i in range(3 * backend.texts_per_request)]
+
+        started = time.monotonic()
+        translations = backend.translate_batch(texts)
+
+        self.assertEqual(translations, [f"[en] {text}" for text in texts])
+        self.assertGreater(server.requests, 3)
+        # The 429s carry Retry-After: 1, which the retry has to wait out
+        self.assertGreaterEqual(time.monotonic() - started, 1)
+
+    def test_server_errors_are_retried(self):
+        random.seed(0)  # The fake server draws its failures from the global generator
+        server = self.start_server(error_rate=0.5)
+        backend = self.make_backend(server, concurrency=4, max_retries=12, backoff=0.001)
+        texts = [f"texto {i}" for i in range(4 * backend.texts_per_request)]
+
+        self.assertEqual(backend.translate_batch(texts), [f"[en] {text}" for text in texts])
+        self.assertGreater(server.requests, 4)
+
+    @override_settings(TRANSLATION_CONCURRENCY=3)
+    def test_requests_in_flight_never_exceed_the_concurrency(self):
+        server = self.start_server(latency_ms=30)
+        backend = self.make_backend(server)
+        backend.texts_per_request = 1
+        texts = [f"texto {i}" for i in range(20)]
+
+        self.assertEqual(backend.translate_batch(texts), [f"[en] {text}" for text in texts])
+        self.assertEqual(server.requests, 20)
+        self.assertLessEqual(server.peak_in_flight, 3)
+
+    def test_failed_translation_falls_back_to_the_original_and_is_not_cached(self):
+        server = self.start_server(error_rate=1.0)
+        service = TranslationService(backend=self.make_backend(server, concurrency=2, max_retries=1, backoff=0.001))
+
+        self.assertEqual(service.translate_to_english(["hola amigos"], ["es"]), ["hola amigos"])
+        self.assertEqual(len(service.cache), 0)
+
+        server.error_rate = 0.0
+        self.assertEqual(service.translate_to_english(["hola amigos"], ["es"]), ["[en] hola amigos"])
+        self.assertEqual(len(service.cache), 1)
+
+
+class GoogleTranslatorBackendTests(SimpleTestCase):
+    @mock.patch.object(translation, "GoogleTranslator")
+    def test_each_worker_thread_reuses_its_translator(self, translator_class):
+        translator_class.return_value.translate.side_effect = lambda text: f"[en] {text}"
+        backend = GoogleTranslatorBackend(concurrency=2, rate_limit=1000)
+        self.addCleanup(backend.executor.shutdown)
+        backend.max_request_chars = 10  # One tweet per request
+        texts = [f"texto {i}" for i in range(20)]
+
+        self.assertEqual(backend.translate_batch(texts), [f"[en] {text}" for text in texts])
+        self.assertEqual(translator_class.return_value.translate.call_count, 20)
+        self.assertLessEqual(translator_class.call_count, 2)
+
+
+class ReadinessTests(TestCase):
+    unloaded = {"sentiment": {"loaded": False, "warmed_up": False}}
+
+    def setUp(self):
+        use_temporary_analysis_cache(self)
+
+    @override_settings(ANALYZER_WARMUP=False)
+    def test_ready_without_warm_up_before_models_load(self):
+        with mock.patch.object(AnalyzerFactory, "status", return_value=self.unloaded):
+            response = self.client.get("/api/ready/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["models"], self.unloaded)
+
+    @override_settings(ANALYZER_WARMUP=True)
+    def test_not_ready_until_warm_up_loads_the_models(self):
+        with mock.patch.object(AnalyzerFactory, "status", return_value=self.unloaded):
+            response = self.client.get("/api/ready/")
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(response.json()["ready"])
+
+    def test_server_entry_point_warms_up_only_when_enabled(self):
+        for enabled in [False, True]:
+            with override_settings(ANALYZER_WARMUP=enabled), mock.patch.object(AnalyzerFactory, "warm_up") as warm_up:
+                start_warm_up()
+            self.assertEqual(warm_up.called, enabled)
+
+
+class LeaderboardTests(TestCase):
+    def test_invalid_threshold_is_a_bad_request(self):
+        for threshold in ["abc", "1.5", "nan"]:
+            response = self.client.get("/api/leaderboard/", {"category": "toxic", "threshold": threshold})
+            self.assertEqual(response.status_code, 400, threshold)
+
+    def test_threshold_outside_the_toxic_category_is_a_bad_request(self):
+        for params in [{"category": "positive"}, {"category": "toxic", "type": "hashtag"}]:
+            response = self.client.get("/api/leaderboard/", {**params, "threshold": "0.8"})
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn("threshold", response.json()["error"])
+
+    def test_threshold_of_zero_counts_every_scored_tweet(self):
+        for i in range(2):
+            Tweet.objects.create(tweet_id_name=f"@a-{i}", handle="@a", content="hi", toxicity_scores=pack_scores([0.9, 0.1]))
+        response = self.client.get("/api/leaderboard/", {"category": "toxic", "threshold": "0"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["results"][0]["count"], 2)
+
+
+class AnalysisJobTests(ReplayPipelineTestCase):
+    def submit(self, **data):
+        response = self.client.post("/api/jobs/", {"hashtag": "sample", "analysis_type": "sentiment", **data})
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()["job_id"]
+        self.assertTrue(wait_until(lambda: AnalysisJob.objects.get(id=job_id).is_finished, timeout=30))
+        return job_id
+
+    def test_job_runs_to_results_and_search_history(self):
+        user = User.objects.create_user(email="a@example.com", username="a", password="password")
+        self.client.force_login(user)
+
+        job_id = self.submit(max_tweets=12)
+
+        job = self.client.get(f"/api/jobs/{job_id}/").json()
+        self.assertEqual(job["status"], AnalysisJob.SUCCEEDED)
+        self.assertEqual(job["progress"]["analyzed"], 12)
+        self.assertEqual(job["progress"]["saved"], 12)
+        results = self.client.get(f"/api/jobs/{job_id}/result/").json()
+        self.assertEqual(len(results), 12)
+        history = userSearchHistory.objects.get(id=job["history_id"])
+        self.assertEqual(history.user, user)
+        self.assertEqual(history.tweets.count(), 12)
+
+    def test_failed_job_reports_its_error(self):
+        with mock.patch.object(pipeline, "score_tweets", side_effect=RuntimeError("model exploded")):
+            job_id = self.submit(max_tweets=5)
+
+        response = self.client.get(f"/api/jobs/{job_id}/result/")
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.json()["status"], AnalysisJob.FAILED)
+        self.assertEqual(response.json()["error"], "model exploded")
+
+
+class StreamingSearchTests(ReplayPipelineTestCase):
+    def stream(self, stream, max_tweets=20):
+        return self.client.post(f"/api/sentiment/scrape/?stream={stream}", {"hashtag": "sample", "max_tweets": max_tweets})
+
+    def test_ndjson_sends_one_record_per_line_then_a_summary(self):
+        response = self.stream("ndjson")
+
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        body = b"".join(response.streaming_content).decode()
+        self.assertTrue(body.endswith("\n"))
+        records = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([record["type"] for record in records], ["tweet"] * 20 + ["summary"])
+        self.assertEqual(records[-1]["count"], 20)
+        # Same tweets in the same order as the plain JSON response
+        plain = self.client.post("/api/sentiment/scrape/", {"hashtag": "sample", "max_tweets": 20}).json()
+        self.assertEqual([record["tweet"] for record in records[:-1]], plain)
+
+    def test_sse_sends_named_events(self):
+        response = self.stream("sse", max_tweets=5)
+
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        body = b"".join(response.streaming_content).decode()
+        self.assertTrue(body.endswith("\n\n"))
+        events = [block.split("\n") for block in body.strip().split("\n\n")]
+        for event, data in events:
+            self.assertEqual(json.loads(data.removeprefix("data: "))["type"], event.removeprefix("event: "))
+        self.assertEqual([event for event, _ in events], ["event: tweet"] * 5 + ["event: summary"])
+
+    def test_pipeline_error_mid_stream_ends_with_an_error_record(self):
+        first_sent = threading.Event()
+        real_scrape_batches = pipeline.scrape_batches
+
+        def fail_after_first_batch(*args, **kwargs):
+            batches = real_scrape_batches(*args, **kwargs)
+            try:
+                yield next(batches)
+                first_sent.wait(timeout=10)  # Fail only once a tweet has gone out
+                raise RuntimeError("scraper exploded")
+            finally:
+                batches.close()
+
+        with mock.patch.object(pipeline, "scrape_batches", side_effect=fail_after_first_batch):
+            response = self.stream("ndjson")
+            records = []
+            for chunk in response.streaming_content:
+                records.append(json.loads(chunk))
+                first_sent.set()
+
+        self.assertEqual(response.status_code, 200)  # Already sent before the failure
+        self.assertEqual(records[0]["type"], "tweet")
+        self.assertEqual(records[-1], {"type": "error", "error": "scraper exploded", "status": 500})
+        self.assertNotIn("summary", [record["type"] for record in records])
+
+    def test_closing_the_response_early_returns_the_scraper_session(self):
+        response = self.stream("ndjson", max_tweets=30)
+        records = iter(response.streaming_content)
+        self.assertEqual(json.loads(next(records))["type"], "tweet")
+
+        response.close()
+
+        self.assertEqual(self.pool.status(), {"size": 1, "sessions": 1, "idle": 1})
+
+
+class InterruptedJobTests(TestCase):
+    def create_job(self, heartbeat_age):
+        return AnalysisJob.objects.create(
+            search_query="sample", search_type="hashtag", analysis_type="sentiment", max_tweets=10,
+            status=AnalysisJob.RUNNING, heartbeat_at=timezone.now() - timedelta(seconds=heartbeat_age)
+        )
+
+    @override_settings(ANALYSIS_JOB_HEARTBEAT_INTERVAL=30)
+    def test_only_jobs_without_a_recent_heartbeat_are_failed(self):
+        stale = self.create_job(heartbeat_age=300)
+        live = self.create_job(heartbeat_age=20)  # Owned by another process that is still running
+
+        response = self.client.get(f"/api/jobs/{stale.id}/")
+
+        self.assertEqual(response.json()["status"], AnalysisJob.FAILED)
+        self.assertEqual(response.json()["error"], "Interrupted by a server restart")
+        live.refresh_from_db()
+        self.assertEqual(live.status, AnalysisJob.RUNNING)
+
+
+class InferenceWorkerPoolTests(SimpleTestCase):
+    @override_settings(ANALYZER_BACKENDS={"sentiment": "traced"})
+    def test_traced_backend_is_refused_before_loading(self):
+        pool = InferenceWorkerPool(workers=1, address="unused", authkey=b"key", analysis_types=["sentiment"])
+        with mock.patch.object(AnalyzerFactory, "get_analyzer", side_effect=AssertionError("model loaded")):
+            with self.assertRaisesMessage(ValueError, "traced"):
+                pool.start()
+
+    def test_client_gives_up_on_a_pool_that_does_not_answer(self):
+        address = os.path.join(tempfile.mkdtemp(), "pool.sock")
+        listener = Listener(address, authkey=b"key")
+        self.addCleanup(listener.close)
+        accepted = []
+        threading.Thread(target=lambda: accepted.append(listener.accept()), daemon=True).start()
+
+        client = PoolAnalyzer("sentiment", address=address, authkey=b"key", timeout=0.1)
+        with self.assertRaises(TimeoutError):
+            client.score_batch(["hello"])
+        # The next call must not read the late answer to this one
+        self.assertIsNone(client._local.connection)
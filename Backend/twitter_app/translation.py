@@ -0,0 +1,283 @@
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from django.db.models import F
+from deep_translator import GoogleTranslator
+from deep_translator.exceptions import RequestError, TooManyRequests
+
+from .cache import LRUCache, content_digest
+from .langid import identify_languages
+from .models import Tweet
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TRANSLATION_CACHE_SIZE = 10000
+DEFAULT_TRANSLATION_CONCURRENCY = 8
+DEFAULT_TRANSLATION_RATE_LIMIT = 10  # Requests per second across all workers
+DEFAULT_TRANSLATION_MAX_RETRIES = 3
+DEFAULT_TRANSLATION_RETRY_BACKOFF = 0.5  # Seconds before the first retry
+
+
+class TokenBucket:
+    """Thread-safe token bucket: allows bursts of `capacity` requests and `rate` requests per second on average."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class RetryableError(Exception):
+    """A translation request failed in a way that is worth retrying, e.g. rate limited or a 5xx."""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ConcurrentTranslatorBackend:
+    """Splits a batch into requests and sends them from a bounded thread pool, rate limited and retried.
+
+    Subclasses implement `_group` to decide which texts share a request and `_request` to send one.
+    """
+    name = None
+
+    def __init__(self, concurrency=None, rate_limit=None, max_retries=None, backoff=None):
+        self.concurrency = concurrency or getattr(settings, 'TRANSLATION_CONCURRENCY', DEFAULT_TRANSLATION_CONCURRENCY)
+        self.max_retries = max_retries if max_retries is not None else getattr(settings, 'TRANSLATION_MAX_RETRIES', DEFAULT_TRANSLATION_MAX_RETRIES)
+        self.backoff = backoff if backoff is not None else getattr(settings, 'TRANSLATION_RETRY_BACKOFF', DEFAULT_TRANSLATION_RETRY_BACKOFF)
+        rate_limit = rate_limit or getattr(settings, 'TRANSLATION_RATE_LIMIT', DEFAULT_TRANSLATION_RATE_LIMIT)
+        self.bucket = TokenBucket(rate_limit, capacity=self.concurrency) if rate_limit else None
+        self.executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix=f"translate-{self.name}")
+
+    def translate_batch(self, texts):
+        """Return the English translation of each text, or None where translation failed."""
+        translations = [None] * len(texts)
+        groups = list(self._group(texts))
+        futures = [self.executor.submit(self._send, [texts[i] for i in group]) for group in groups]
+        for group, future in zip(groups, futures):
+            for i, translated in zip(group, future.result()):
+                translations[i] = translated
+        return translations
+
+    def _send(self, texts):
+        try:
+            return self._with_retries(texts)
+        except Exception as e:
+            logger.error(f"Translation error: {e}")
+            return [None] * len(texts)
+
+    def _with_retries(self, texts):
+        for attempt in range(self.max_retries + 1):
+            if self.bucket:
+                self.bucket.acquire()
+            try:
+                return self._request(texts)
+            except RetryableError as e:
+                if attempt == self.max_retries:
+                    raise
+                # Exponential backoff with jitter, unless the server said how long to wait
+                delay = e.retry_after if e.retry_after is not None else self.backoff * 2 ** attempt * (0.5 + random.random())
+                logger.warning(f"Translation request failed ({e}), retrying in {delay:.2f}s")
+                time.sleep(delay)
+
+    def _group(self, texts):
+        for i in range(len(texts)):
+            yield [i]
+
+    def _request(self, texts):
+        raise NotImplementedError
+
+
+class GoogleTranslatorBackend(ConcurrentTranslatorBackend):
+    """Translates through Google Translate via deep_translator, packing several tweets into each request.
+
+    Each worker thread builds its translator once and reuses it. deep_translator sends every request with
+    a plain requests.get, so unlike HTTPTranslatorBackend there is no session whose connections we could keep alive.
+    """
+    name = "google"
+    max_request_chars = 4500  # Google Translate rejects requests over 5000 characters
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._local = threading.local()
+
+    def _translator(self):
+        translator = getattr(self._local, "translator", None)
+        if translator is None:
+            translator = self._local.translator = GoogleTranslator(source='auto', target='en')
+        return translator
+
+    def _request(self, texts):
+        translator = self._translator()
+        try:
+            if len(texts) > 1:
+                lines = translator.translate("\n".join(texts)).split("\n")
+                if len(lines) == len(texts):
+                    return lines
+                # The translator merged lines: translate each tweet on its own
+            return [translator.translate(text) for text in texts]
+        except (RequestError, TooManyRequests, requests.ConnectionError, requests.Timeout) as e:
+            raise RetryableError(str(e))
+
+    def _group(self, texts):
+        """Split text indices into newline-joinable requests; multi-line tweets go alone."""
+        group, size = [], 0
+        for i, text in enumerate(texts):
+            if "\n" in text:
+                yield [i]
+                continue
+            if group and size + len(text) + 1 > self.max_request_chars:
+                yield group
+                group, size = [], 0
+            group.append(i)
+            size += len(text) + 1
+        if group:
+            yield group
+
+
+class HTTPTranslatorBackend(ConcurrentTranslatorBackend):
+    """Client for a LibreTranslate-compatible API (POST /translate), e.g. a self-hosted instance.
+
+    All worker threads share one requests.Session whose connection pool is sized to the concurrency,
+    so connections are kept alive across requests instead of being opened per tweet.
+    """
+    name = "http"
+    texts_per_request = 16
+
+    def __init__(self, url=None, api_key=None, timeout=10, **kwargs):
+        super().__init__(**kwargs)
+        self.url = (url or settings.TRANSLATION_API_URL).rstrip('/') + '/translate'
+        self.api_key = api_key or getattr(settings, 'TRANSLATION_API_KEY', None)
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _group(self, texts):
+        for start in range(0, len(texts), self.texts_per_request):
+            yield list(range(start, min(start + self.texts_per_request, len(texts))))
+
+    def _request(self, texts):
+        payload = {"q": texts, "source": "auto", "target": "en", "format": "text"}
+        if self.api_key:
+            payload["api_key"] = self.api_key
+        try:
+            response = self.session.post(self.url, json=payload, timeout=self.timeout)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise RetryableError(str(e))
+        if response.status_code == 429 or response.status_code >= 500:
+            retry_after = response.headers.get('Retry-After')
+            raise RetryableError(
+                f"HTTP {response.status_code}",
+                retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None
+            )
+        response.raise_for_status()
+        translated = response.json()["translatedText"]
+        return translated if isinstance(translated, list) else [translated]
+
+
+class LocalTranslatorBackend:
+    """Offline stand-in that marks text as translated without calling any service, for tests and benchmarks."""
+    name = "local"
+
+    def translate_batch(self, texts):
+        return [f"[en] {text}" for text in texts]
+
+
+TRANSLATOR_BACKENDS = {backend.name: backend for backend in [GoogleTranslatorBackend, HTTPTranslatorBackend, LocalTranslatorBackend]}
+
+
+class TranslationService:
+    """Translates non-English tweets, only sending content to the translator when no earlier answer exists.
+
+    Lookups go, in order, to an in-process cache keyed on the content hash, to translations already
+    stored on Tweet rows, and finally to the translator backend in one batched call for the misses.
+    """
+
+    def __init__(self, backend=None, cache_size=None):
+        self.backend = backend or TRANSLATOR_BACKENDS[getattr(settings, 'TRANSLATION_BACKEND', 'google')]()
+        self.cache = LRUCache(cache_size or getattr(settings, 'TRANSLATION_CACHE_SIZE', DEFAULT_TRANSLATION_CACHE_SIZE))
+
+    def translate_to_english(self, texts, languages=None, names=None):
+        """Return the English translation of each text, or None for texts that are already English.
+
+        `languages` can pass in languages already identified for the texts, and `names` the
+        tweet_id_name of each text so translations stored with earlier scrapes are reused.
+        """
+        if languages is None:
+            languages = identify_languages(texts)
+        if names is None:
+            names = [None] * len(texts)
+        pending = {}
+        for text, language, name in zip(texts, languages, names):
+            if language != 'en':
+                pending.setdefault(text, set()).add(name)
+        translations = self._translate(pending) if pending else {}
+        return [
+            None if language == 'en' else translations[text]
+            for text, language in zip(texts, languages)
+        ]
+
+    def _translate(self, pending):
+        """Translate each text in `pending`, a dict of text to the names of the tweets it came from."""
+        translations = {}
+        for text in pending:
+            cached = self.cache.get(content_digest(text))
+            if cached is not None:
+                translations[text] = cached
+
+        missing = [text for text in pending if text not in translations]
+        names = {name for text in missing for name in pending[text] if name is not None}
+        if names:
+            # Look up by the unique tweet_id_name; content is an unindexed TextField. Rows where
+            # translation failed stored the original text, so don't reuse those.
+            stored = Tweet.objects.filter(
+                tweet_id_name__in=names,
+                translated_content__isnull=False
+            ).exclude(translated_content=F('content')).values_list('content', 'translated_content')
+            for content, translated_content in stored:
+                if content in pending and content not in translations:
+                    translations[content] = translated_content
+                    self.cache.set(content_digest(content), translated_content)
+
+        missing = [text for text in missing if text not in translations]
+        if missing:
+            for text, translated in zip(missing, self.backend.translate_batch(missing)):
+                if translated is None:
+                    translations[text] = text  # Fallback to original text if translation fails
+                    continue
+                translations[text] = translated
+                self.cache.set(content_digest(text), translated)
+        return translations
+
+_translation_service = None
+_translation_lock = threading.Lock()
+
+
+def get_translation_service():
+    global _translation_service
+    with _translation_lock:
+        if _translation_service is None:
+            _translation_service = TranslationService()
+    return _translation_service
@@ -13,13 +13,18 @@ urlpatterns = [
     path('api/index/', views.IndexAPIView.as_view(), name='index'),
     path('api/home/', views.HomepageAPIView.as_view(), name='homepage'),
     path('api/history/', views.HistoryPageAPIView.as_view(), name='history'),
+    path('api/ready/', views.ReadinessAPIView.as_view(), name='readiness'),
     
     # Existing API endpoints
     path('api/combined/scrape/', views.TweetAPIView.as_view(), name='tweet_scrape'),
     path('api/sentiment/scrape/', views.SentimentAPIView.as_view(), name='sentiment_scrape'),
     path('api/toxicity/scrape/', views.ToxicityAPIView.as_view(), name='toxicity_scrape'),
     path('api/emotion/scrape/', views.EmotionAPIView.as_view(), name='emotion_scrape'),
+    path('api/jobs/', views.AnalysisJobAPIView.as_view(), name='analysis_job_submit'),
+    path('api/jobs/<uuid:job_id>/', views.AnalysisJobStatusAPIView.as_view(), name='analysis_job'),
+    path('api/jobs/<uuid:job_id>/result/', views.AnalysisJobResultAPIView.as_view(), name='analysis_job_result'),
     path('api/livewall/', views.LiveWallAPIView.as_view(), name='livewall_get_tweets'),
     path('api/history/tweets/<int:history_id>/', views.HistoryAPIView.as_view(), name='history_tweets'),
     path('api/leaderboard/', views.LeaderboardAPIView.as_view(), name='leaderboard'),
+    path('api/stats/', views.StatsAPIView.as_view(), name='stats'),
 ]
\ No newline at end of file
@@ -1,69 +1,33 @@
 from django.shortcuts import redirect
+from django.urls import reverse
+from django.conf import settings
 from django.contrib.auth import authenticate, login, logout
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
-from .models import Tweet, userSearchHistory, User
+from rest_framework.renderers import BaseRenderer
+from rest_framework.settings import api_settings
+from .models import Tweet, userSearchHistory, User, AnalysisJob, ANALYSIS_LABELS, unpack_scores
 from .serializers import TweetSerializer
-from .scraper import TwitterScraper
-from .analyzer import analyze_tweet
-from dotenv import load_dotenv
-import os
+from .scraper import ScraperUnavailable
+from .analyzer import AnalyzerFactory
+from .pipeline import SCRAPER_POOL, iter_analysis, run_analysis, save_search_history
+from .jobs import submit_job, job_status, job_results, fail_interrupted_jobs
 import logging
 from django.db.models import Q
 from .forms import RegistrationForm
 from django.views.decorators.csrf import ensure_csrf_cookie
-from django.http import JsonResponse
-from langdetect import detect
-from deep_translator import GoogleTranslator
+from django.http import JsonResponse, StreamingHttpResponse
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db.models import Count, Avg
+import numpy as np
+import json
+import time
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# Load environment variables
-load_dotenv()
-
-# Singleton scraper instance
-SCAPER = TwitterScraper.get_instance(
-    mail=os.getenv("TWITTER_MAIL"),
-    username=os.getenv("TWITTER_USERNAME"),
-    password=os.getenv("TWITTER_PASSWORD")
-)
-logger.info("Scraper initialized and logged in")
-
-# Utility Functions
-def get_scraper():
-    """Retrieve or reinitialize the singleton Twitter scraper instance."""
-    global SCAPER
-    if not SCAPER.driver.service.is_connectable():
-        logger.warning("Scraper session expired, reinitializing...")
-        SCAPER.quit()
-        SCAPER = TwitterScraper.get_instance(
-            mail=os.getenv("TWITTER_MAIL"),
-            username=os.getenv("TWITTER_USERNAME"),
-            password=os.getenv("TWITTER_PASSWORD")
-        )
-    return SCAPER
-
-def detect_language(text):
-    """Detect the language of the given text."""
-    try:
-        return detect(text)
-    except Exception as e:
-        logger.error(f"Language detection error: {e}")
-        return 'unknown'
-
-def translate_to_english(text):
-    """Translate text to English using GoogleTranslator."""
-    try:
-        translator = GoogleTranslator(source='auto', target='en')
-        return translator.translate(text)
-    except Exception as e:
-        logger.error(f"Translation error: {e}")
-        return text  # Fallback to original text if translation fails
-
 # Authentication and Utility Views
 class LogoutAPIView(APIView):
     def post(self, request):
@@ -118,315 +82,202 @@ class HomepageAPIView(APIView):
     def get(self, request):
         return Response({'message': 'Welcome to the homepage'})
 
+class ReadinessAPIView(APIView):
+    def get(self, request):
+        models = AnalyzerFactory.status()
+        warm_up = getattr(settings, 'ANALYZER_WARMUP', False)
+        # Without warm-up the models load on the first request that needs them
+        ready = not warm_up or all(model["loaded"] for model in models.values())
+        cache = AnalyzerFactory.get_cache()
+        return Response({
+            "ready": ready,
+            "warm_up": warm_up,
+            "models": models,
+            "cache": cache.stats() if cache is not None else None,
+            "scrapers": SCRAPER_POOL.status()
+        }, status=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE)
+
 # Tweet Analysis Views
-class SentimentAPIView(APIView):
+STREAM_CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+def stream_format(request):
+    """'ndjson' or 'sse' if the client asked for a streamed response with ?stream= or its Accept header, else None."""
+    requested = request.query_params.get("stream")
+    if requested in STREAM_CONTENT_TYPES:
+        return requested
+    accept = request.META.get("HTTP_ACCEPT", "")
+    for stream, content_type in STREAM_CONTENT_TYPES.items():
+        if content_type in accept:
+            return stream
+    return None
+
+def stream_record(stream, kind, payload):
+    data = json.dumps({"type": kind, **payload}, cls=DjangoJSONEncoder)
+    if stream == "sse":
+        return f"event: {kind}\ndata: {data}\n\n"
+    return data + "\n"
+
+class StreamRenderer(BaseRenderer):
+    """Lets DRF accept the streaming media types; only plain responses such as errors are rendered here."""
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return stream_record(self.format, "error" if isinstance(data, dict) and "error" in data else "message", data or {})
+
+class NDJSONRenderer(StreamRenderer):
+    media_type = STREAM_CONTENT_TYPES["ndjson"]
+    format = "ndjson"
+
+class EventStreamRenderer(StreamRenderer):
+    media_type = STREAM_CONTENT_TYPES["sse"]
+    format = "sse"
+
+class AnalysisSearchView(APIView):
+    """Scrape a username or hashtag and analyse it through the shared pipeline.
+
+    With ?stream=ndjson or ?stream=sse (or the matching Accept header) each tweet is sent as soon as it
+    has been analysed and saved, followed by a summary record, instead of one JSON array at the end.
+    """
+    analysis_type = None
+    default_max_tweets = 100
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, NDJSONRenderer, EventStreamRenderer]
+
     def post(self, request):
         try:
+            analysis_type = self._get_analysis_type(request.data)
             username, hashtag, max_tweets = self._validate_input(request.data)
-            scraper = get_scraper()
-            tweets_data = scraper.scrape_tweets(
-                max_tweets=max_tweets,
-                scrape_username=username,
-                scrape_hashtag=hashtag
-            )
-            
-            if not tweets_data:
-                return Response({"message": "No tweets found"}, status=status.HTTP_200_OK)
-
-            analyzed_tweets = []
-            tweets_objects = []
-
-            for tweet_dict in tweets_data:
-                original_content = tweet_dict['content']
-                language = detect_language(original_content)
-                if language != 'en':
-                    translated_content = translate_to_english(original_content)
-                    content_for_analysis = translated_content
-                else:
-                    translated_content = None
-                    content_for_analysis = original_content
-                
-                sentiment = analyze_tweet(content_for_analysis, "sentiment")
-                
-                tweet, created = Tweet.objects.update_or_create(
-                    tweet_id_name=f"{tweet_dict['tweet_id']}_{tweet_dict['timestamp']}",
-                    defaults={
-                        "handle": tweet_dict["handle"],
-                        "content": original_content,
-                        "translated_content": translated_content,
-                        "timestamp": tweet_dict["timestamp"],
-                        "sentiment": sentiment,
-                    }
+            stream = stream_format(request)
+            if stream:
+                response = StreamingHttpResponse(
+                    self._stream(stream, request.user, analysis_type, max_tweets, username, hashtag),
+                    content_type=STREAM_CONTENT_TYPES[stream]
                 )
-                tweets_objects.append(tweet)
-                
-                tweet_data = TweetSerializer(tweet).data
-                analyzed_tweets.append(tweet_data)
+                response["Cache-Control"] = "no-cache"
+                response["X-Accel-Buffering"] = "no"  # Stop nginx from holding records back
+                return response
+            tweets_objects, analyzed_tweets = run_analysis(analysis_type, max_tweets, username, hashtag)
+
+            if not analyzed_tweets:
+                return Response({"message": "No tweets found"}, status=status.HTTP_200_OK)
 
             if request.user.is_authenticated:
-                search_query = username if username else hashtag
-                search_type = "username" if username else "hashtag"
-                search_history = userSearchHistory.objects.create(
-                    user=request.user,
-                    search_query=search_query,
-                    search_type=search_type,
-                    analysis_type="sentiment"
-                )
-                search_history.tweets.set(tweets_objects)
-                search_history.save()
+                save_search_history(request.user, analysis_type, tweets_objects, username, hashtag)
             return Response(analyzed_tweets, status=status.HTTP_200_OK)
 
         except ValueError as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except ScraperUnavailable as e:
+            return Response({"error": str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
         except Exception as e:
-            logger.error(f"Error in sentiment analysis: {e}")
+            logger.error(f"Error in {self.analysis_type or 'tweet'} analysis: {e}")
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    def _validate_input(self, data):
-        username = data.get("username")
-        hashtag = data.get("hashtag")
-        max_tweets = int(data.get("max_tweets", 100))
-        targets = [t for t in [username, hashtag] if t]
-        if len(targets) != 1:
-            raise ValueError("Enter either username or hashtag, not both")
-        return username, hashtag, max_tweets
-
-class ToxicityAPIView(APIView):
-    def post(self, request):
+    def _stream(self, stream, user, analysis_type, max_tweets, username, hashtag):
+        """Tweet records as the pipeline produces them, then a summary; failures become an error record."""
+        started = time.monotonic()
+        tweets_objects = []
         try:
-            username, hashtag, max_tweets = self._validate_input(request.data)
-            scraper = get_scraper()
-            tweets_data = scraper.scrape_tweets(
-                max_tweets=max_tweets,
-                scrape_username=username,
-                scrape_hashtag=hashtag
-            )
-            
-            if not tweets_data:
-                return Response({"message": "No tweets found"}, status=status.HTTP_200_OK)
-
-            analyzed_tweets = []
-            tweets_objects = []
-
-            for tweet_dict in tweets_data:
-                original_content = tweet_dict['content']
-                language = detect_language(original_content)
-                if language != 'en':
-                    translated_content = translate_to_english(original_content)
-                    content_for_analysis = translated_content
-                else:
-                    translated_content = None
-                    content_for_analysis = original_content
-                
-                toxicity = analyze_tweet(content_for_analysis, "toxicity")
-                
-                tweet, created = Tweet.objects.update_or_create(
-                    tweet_id_name=f"{tweet_dict['tweet_id']}_{tweet_dict['timestamp']}",
-                    defaults={
-                        "handle": tweet_dict["handle"],
-                        "content": original_content,
-                        "translated_content": translated_content,
-                        "timestamp": tweet_dict["timestamp"],
-                        "toxicity": toxicity,
-                    }
-                )
-                tweets_objects.append(tweet)
-                
-                tweet_data = TweetSerializer(tweet).data
-                analyzed_tweets.append(tweet_data)
-
-            if request.user.is_authenticated:
-                search_query = username if username else hashtag
-                search_type = "username" if username else "hashtag"
-                search_history = userSearchHistory.objects.create(
-                    user=request.user,
-                    search_query=search_query,
-                    search_type=search_type,
-                    analysis_type="toxicity"
-                )
-                search_history.tweets.set(tweets_objects)
-                search_history.save()
-            return Response(analyzed_tweets, status=status.HTTP_200_OK)
-
-        except ValueError as e:
-            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            for batch in iter_analysis(analysis_type, max_tweets, username, hashtag):
+                for tweet, data in batch:
+                    tweets_objects.append(tweet)
+                    yield stream_record(stream, "tweet", {"tweet": data})
+            history_id = None
+            if user.is_authenticated and tweets_objects:
+                history_id = save_search_history(user, analysis_type, tweets_objects, username, hashtag).id
+            yield stream_record(stream, "summary", {
+                "analysis_type": analysis_type,
+                "count": len(tweets_objects),
+                "history_id": history_id,
+                "elapsed": round(time.monotonic() - started, 3),
+            })
+        except ScraperUnavailable as e:
+            yield stream_record(stream, "error", {"error": str(e), "status": status.HTTP_503_SERVICE_UNAVAILABLE})
         except Exception as e:
-            logger.error(f"Error in toxicity analysis: {e}")
-            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            logger.error(f"Error in streamed {analysis_type} analysis: {e}")
+            yield stream_record(stream, "error", {"error": str(e), "status": status.HTTP_500_INTERNAL_SERVER_ERROR})
+
+    def _get_analysis_type(self, data):
+        return self.analysis_type
 
     def _validate_input(self, data):
         username = data.get("username")
         hashtag = data.get("hashtag")
-        max_tweets = int(data.get("max_tweets", 50))
+        max_tweets = int(data.get("max_tweets", self.default_max_tweets))
         targets = [t for t in [username, hashtag] if t]
         if len(targets) != 1:
             raise ValueError("Enter either username or hashtag, not both")
         return username, hashtag, max_tweets
 
-class EmotionAPIView(APIView):
-    def post(self, request):
-        try:
-            username, hashtag, max_tweets = self._validate_input(request.data)
-            scraper = get_scraper()
-            tweets_data = scraper.scrape_tweets(
-                max_tweets=max_tweets,
-                scrape_username=username,
-                scrape_hashtag=hashtag
-            )
-            
-            if not tweets_data:
-                return Response({"message": "No tweets found"}, status=status.HTTP_200_OK)
+class SentimentAPIView(AnalysisSearchView):
+    analysis_type = "sentiment"
 
-            analyzed_tweets = []
-            tweets_objects = []
-
-            for tweet_dict in tweets_data:
-                original_content = tweet_dict['content']
-                language = detect_language(original_content)
-                if language != 'en':
-                    translated_content = translate_to_english(original_content)
-                    content_for_analysis = translated_content
-                else:
-                    translated_content = None
-                    content_for_analysis = original_content
-                
-                emotion = analyze_tweet(content_for_analysis, "emotion")
-                
-                tweet, created = Tweet.objects.update_or_create(
-                    tweet_id_name=f"{tweet_dict['tweet_id']}_{tweet_dict['timestamp']}",
-                    defaults={
-                        "handle": tweet_dict["handle"],
-                        "content": original_content,
-                        "translated_content": translated_content,
-                        "timestamp": tweet_dict["timestamp"],
-                        "emotion": emotion,
-                    }
-                )
-                tweets_objects.append(tweet)
-                
-                tweet_data = TweetSerializer(tweet).data
-                analyzed_tweets.append(tweet_data)
+class ToxicityAPIView(AnalysisSearchView):
+    analysis_type = "toxicity"
 
-            if request.user.is_authenticated:
-                search_query = username if username else hashtag
-                search_type = "username" if username else "hashtag"
-                search_history = userSearchHistory.objects.create(
-                    user=request.user,
-                    search_query=search_query,
-                    search_type=search_type,
-                    analysis_type="emotion"
-                )
-                search_history.tweets.set(tweets_objects)
-                search_history.save()
+class EmotionAPIView(AnalysisSearchView):
+    analysis_type = "emotion"
 
-            return Response(analyzed_tweets, status=status.HTTP_200_OK)
+class TweetAPIView(AnalysisSearchView):
+    default_max_tweets = 50
 
-        except ValueError as e:
-            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
-        except Exception as e:
-            logger.error(f"Error in emotion analysis: {e}")
-            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    def _get_analysis_type(self, data):
+        analysis_type = data.get("analysis_type")
+        if analysis_type not in ["sentiment", "toxicity", "emotion", "combined"]:
+            raise ValueError("Invalid analysis type")
+        return analysis_type
 
-    def _validate_input(self, data):
-        username = data.get("username")
-        hashtag = data.get("hashtag")
-        max_tweets = int(data.get("max_tweets", 50))
-        targets = [t for t in [username, hashtag] if t]
-        if len(targets) != 1:
-            raise ValueError("Enter either username or hashtag, not both")
-        return username, hashtag, max_tweets
+# Background analysis jobs
+class AnalysisJobAPIView(TweetAPIView):
+    """Queue a search for background analysis and return its job id without waiting for the scrape."""
 
-class TweetAPIView(APIView):
     def post(self, request):
         try:
-            analysis_type = request.data.get("analysis_type")
-            if analysis_type not in ["sentiment", "toxicity", "emotion", "combined"]:
-                return Response({"error": "Invalid analysis type"}, status=status.HTTP_400_BAD_REQUEST)
-
+            analysis_type = self._get_analysis_type(request.data)
             username, hashtag, max_tweets = self._validate_input(request.data)
-            scraper = get_scraper()
-            tweets_data = scraper.scrape_tweets(
-                max_tweets=max_tweets,
-                scrape_username=username,
-                scrape_hashtag=hashtag
-            )
-
-            if not tweets_data:
-                return Response({"message": "No tweets found"}, status=status.HTTP_200_OK)
-
-            analyzed_tweets = []
-            tweets_objects = []
-
-            for tweet_dict in tweets_data:
-                original_content = tweet_dict['content']
-                language = detect_language(original_content)
-                if language != 'en':
-                    translated_content = translate_to_english(original_content)
-                    content_for_analysis = translated_content
-                else:
-                    translated_content = None
-                    content_for_analysis = original_content
-
-                if analysis_type == "combined":
-                    sentiment = analyze_tweet(content_for_analysis, "sentiment")
-                    toxicity = analyze_tweet(content_for_analysis, "toxicity")
-                    emotion = analyze_tweet(content_for_analysis, "emotion")
-                    defaults = {
-                        "handle": tweet_dict["handle"],
-                        "content": original_content,
-                        "translated_content": translated_content,
-                        "timestamp": tweet_dict["timestamp"],
-                        "sentiment": sentiment,
-                        "toxicity": toxicity,
-                        "emotion": emotion,
-                    }
-                else:
-                    result = analyze_tweet(content_for_analysis, analysis_type)
-                    defaults = {
-                        "handle": tweet_dict["handle"],
-                        "content": original_content,
-                        "translated_content": translated_content,
-                        "timestamp": tweet_dict["timestamp"],
-                        analysis_type: result,
-                    }
-
-                tweet, created = Tweet.objects.update_or_create(
-                    tweet_id_name=f"{tweet_dict['tweet_id']}_{tweet_dict['timestamp']}",
-                    defaults=defaults
-                )
-                tweets_objects.append(tweet)
-                
-                tweet_data = TweetSerializer(tweet).data
-                analyzed_tweets.append(tweet_data)
-
-            if request.user.is_authenticated:
-                search_query = username if username else hashtag
-                search_type = "username" if username else "hashtag"
-                search_history = userSearchHistory.objects.create(
-                    user=request.user,
-                    search_query=search_query,
-                    search_type=search_type,
-                    analysis_type=analysis_type
-                )
-                search_history.tweets.set(tweets_objects)
-                search_history.save()
-
-            return Response(analyzed_tweets, status=status.HTTP_200_OK)
-
+            job = submit_job(request.user, analysis_type, max_tweets, username, hashtag)
+            return Response({
+                **job_status(job),
+                "status_url": reverse('analysis_job', args=[job.id]),
+                "result_url": reverse('analysis_job_result', args=[job.id]),
+            }, status=status.HTTP_202_ACCEPTED)
         except ValueError as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
-            logger.error(f"Error scraping tweets: {e}")
+            logger.error(f"Error submitting analysis job: {e}")
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    def _validate_input(self, data):
-        username = data.get("username")
-        hashtag = data.get("hashtag")
-        max_tweets = int(data.get("max_tweets", 50))
-        targets = [t for t in [username, hashtag] if t]
-        if len(targets) != 1:
-            raise ValueError("Enter either username or hashtag, not both")
-        return username, hashtag, max_tweets
+def get_job(request, job_id):
+    """The job with this id, if the requester may see it; jobs submitted while logged in belong to that user."""
+    fail_interrupted_jobs()
+    job = AnalysisJob.objects.filter(id=job_id).first()
+    if job is None or (job.user_id is not None and job.user_id != request.user.pk):
+        return None
+    return job
+
+class AnalysisJobStatusAPIView(APIView):
+    def get(self, request, job_id):
+        job = get_job(request, job_id)
+        if job is None:
+            return Response({"error": "Job not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(job_status(job), status=status.HTTP_200_OK)
+
+class AnalysisJobResultAPIView(APIView):
+    def get(self, request, job_id):
+        job = get_job(request, job_id)
+        if job is None:
+            return Response({"error": "Job not found"}, status=status.HTTP_404_NOT_FOUND)
+        if job.status == AnalysisJob.FAILED:
+            return Response(job_status(job), status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        if not job.is_finished:
+            # Not ready yet: poll the status endpoint or try again later
+            return Response(job_status(job), status=status.HTTP_202_ACCEPTED)
+        tweets = job_results(job)
+        if not tweets:
+            return Response({"message": "No tweets found"}, status=status.HTTP_200_OK)
+        return Response(tweets, status=status.HTTP_200_OK)
 
 # Display Views
 class LiveWallAPIView(APIView):
@@ -471,7 +322,48 @@ class HistoryPageAPIView(APIView):
         ]
         return Response({'search_history': serialized_history})
 
+def stored_scores(analysis_type, queryset=None):
+    """Yield (handle, probability vector) for every tweet with stored scores for the analysis type."""
+    queryset = Tweet.objects.all() if queryset is None else queryset
+    field = f"{analysis_type}_scores"
+    for handle, data in queryset.filter(**{f"{field}__isnull": False}).values_list('handle', field).iterator():
+        scores = unpack_scores(data)
+        if scores is not None:
+            yield handle, scores
+
+class StatsAPIView(APIView):
+    def get(self, request):
+        """Aggregate stored class probabilities, optionally for one handle."""
+        try:
+            queryset = Tweet.objects.all()
+            handle = request.query_params.get('handle')
+            if handle:
+                queryset = queryset.filter(handle=handle if handle.startswith('@') else f"@{handle}")
+            stats = {}
+            for analysis_type, labels in ANALYSIS_LABELS.items():
+                scores = np.array([vector for _, vector in stored_scores(analysis_type, queryset)])
+                if not len(scores):
+                    stats[analysis_type] = {"count": 0, "mean_scores": None, "distribution": None}
+                    continue
+                counts = np.bincount(np.argmax(scores, axis=1), minlength=len(labels))
+                stats[analysis_type] = {
+                    "count": len(scores),
+                    "mean_scores": dict(zip(labels, scores.mean(axis=0).round(4).tolist())),
+                    "distribution": dict(zip(labels, counts.tolist())),
+                }
+            return Response({"handle": handle, "stats": stats}, status=status.HTTP_200_OK)
+        except Exception as e:
+            logger.error(f"Error computing stats: {e}")
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
 class LeaderboardAPIView(APIView):
+    # Categories ranked by mean stored probability of one class instead of label counts
+    SCORE_CATEGORIES = {
+        'most_positive': ('sentiment', 'Positive'),
+        'most_negative': ('sentiment', 'Negative'),
+        'most_toxic': ('toxicity', 'offensive'),
+    }
+
     def get(self, request):
         try:
             # Get query parameters
@@ -479,8 +371,21 @@ class LeaderboardAPIView(APIView):
             category = request.query_params.get('category', 'positive')  # 'positive', 'negative', 'toxic', etc.
             limit = int(request.query_params.get('limit', 10))  # Number of results to return
             
+            threshold = request.query_params.get('threshold')  # Probability cut-off for 'toxic', e.g. 0.8
+            if threshold is not None:
+                try:
+                    threshold = float(threshold)
+                except ValueError:
+                    threshold = None
+                if threshold is None or not 0 <= threshold <= 1:
+                    return Response({"error": "Invalid threshold. Use a probability between 0 and 1."}, status=status.HTTP_400_BAD_REQUEST)
+                if board_type != 'username' or category != 'toxic':
+                    return Response({"error": "threshold only applies to the 'toxic' category of the username leaderboard."}, status=status.HTTP_400_BAD_REQUEST)
+
             # Initialize query based on board type
-            if board_type == 'username':
+            if board_type == 'username' and (category in self.SCORE_CATEGORIES or (category == 'toxic' and threshold is not None)):
+                return Response(self._get_score_leaderboard(category, limit, threshold))
+            elif board_type == 'username':
                 queryset = Tweet.objects.values('handle')
             elif board_type == 'hashtag':
                 return Response(self._get_hashtag_leaderboard(category, limit))
@@ -528,6 +433,43 @@ class LeaderboardAPIView(APIView):
             logger.error(f"Error generating leaderboard: {e}")
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
+    def _get_score_leaderboard(self, category, limit, threshold=None):
+        """Rank handles from stored probability vectors, so no tweet has to be re-scored."""
+        if category == 'toxic':
+            analysis_type, label = 'toxicity', 'offensive'
+        else:
+            analysis_type, label = self.SCORE_CATEGORIES[category]
+        index = ANALYSIS_LABELS[analysis_type].index(label)
+
+        by_handle = {}
+        for handle, scores in stored_scores(analysis_type):
+            by_handle.setdefault(handle, []).append(scores[index])
+
+        if threshold is not None:
+            # Count tweets at or above the cut-off rather than relying on the argmax label
+            ranked = [(handle, sum(p >= threshold for p in probs), None) for handle, probs in by_handle.items()]
+            ranked = [entry for entry in ranked if entry[1]]
+            ranked.sort(key=lambda entry: entry[1], reverse=True)
+        else:
+            ranked = [(handle, len(probs), float(np.mean(probs))) for handle, probs in by_handle.items()]
+            ranked.sort(key=lambda entry: entry[2], reverse=True)
+
+        results = []
+        for rank, (handle, count, score) in enumerate(ranked[:limit], start=1):
+            item = {'username': handle, 'count': count, 'rank': rank}
+            if score is not None:
+                item['score'] = round(score, 4)
+            sample_tweet = Tweet.objects.filter(handle=handle).order_by('-timestamp').first()
+            if sample_tweet:
+                item['sample_tweet'] = TweetSerializer(sample_tweet).data
+            results.append(item)
+
+        return {
+            'leaderboard_type': 'username',
+            'category': category,
+            'results': results
+        }
+
     def _get_hashtag_leaderboard(self, category, limit):
         """Generate hashtag leaderboard by analyzing tweet content for hashtags"""
         import re
@@ -0,0 +1,319 @@
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from multiprocessing.connection import Client, Listener, wait
+
+from django.conf import settings
+
+from .models import scores_to_label
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_TIMEOUT = 120  # Seconds to wait for the pool to answer one request
+
+
+def parse_pool_address(address):
+    """Turn "host:port" into a TCP address tuple; anything else is a Unix socket path."""
+    if ':' in address and not address.startswith('/'):
+        host, port = address.rsplit(':', 1)
+        return (host, int(port))
+    return address
+
+
+def get_pool_address():
+    """Address of the inference worker pool, or None to run the models in-process."""
+    address = getattr(settings, 'ANALYZER_WORKER_POOL_ADDRESS', None)
+    return parse_pool_address(address) if address else None
+
+
+def get_pool_timeout():
+    return getattr(settings, 'ANALYZER_WORKER_POOL_TIMEOUT', DEFAULT_POOL_TIMEOUT)
+
+
+def get_pool_authkey():
+    key = getattr(settings, 'ANALYZER_WORKER_POOL_AUTHKEY', None) or settings.SECRET_KEY
+    return key.encode('utf-8')
+
+
+def _worker_main(connection, threads):
+    """Worker loop: the models were loaded by the parent before fork, so the weights are shared copy-on-write."""
+    import torch
+    from .analyzer import AnalyzerFactory, CachedAnalyzer
+
+    torch.set_num_threads(threads)
+    while True:
+        try:
+            task = connection.recv()
+        except (EOFError, OSError):
+            return
+        if task is None:
+            return
+        task_id, analysis_type, texts = task
+        try:
+            analyzer = AnalyzerFactory.get_analyzer(analysis_type)
+            # Callers consult the result cache before sending work here
+            if isinstance(analyzer, CachedAnalyzer):
+                analyzer = analyzer.analyzer
+            result = ("ok", analyzer.score_batch(texts))
+        except Exception as e:
+            result = ("error", str(e))
+        connection.send((task_id, result))
+
+
+class WorkerProcess:
+    """A forked worker, the pipe the parent talks to it over and the task it is running, if any."""
+
+    def __init__(self, index, process, connection):
+        self.index = index
+        self.process = process
+        self.connection = connection
+        self.task_id = None
+        self.alive = True
+        self.lock = threading.Lock()
+
+
+class InferenceWorkerPool:
+    """Loads the models once, forks workers that share them and serves batches over a local socket.
+
+    Start it with `manage.py run_inference_pool`; Django processes configured with the same
+    ANALYZER_WORKER_POOL_ADDRESS send their batches here instead of loading their own models.
+    The parent must not run inference before forking, since OpenMP thread pools do not survive fork.
+    Each worker gets one batch at a time over its own pipe, so when a worker dies the batch it was
+    running fails instead of hanging, and a replacement is forked.
+    """
+
+    def __init__(self, workers=None, address=None, authkey=None, analysis_types=None):
+        self.workers = workers or getattr(settings, 'ANALYZER_WORKER_POOL_SIZE', None) or os.cpu_count() or 1
+        self.address = address or get_pool_address()
+        self.authkey = authkey or get_pool_authkey()
+        self.analysis_types = analysis_types
+        self.info = {}
+        self._futures = {}
+        self._futures_lock = threading.Lock()
+        self._task_ids = itertools.count()
+        self._tasks = queue.Queue()
+        self._idle = queue.Queue()
+        self._processes = {}
+        self._closing = False
+
+    def start(self):
+        from .analyzer import AnalyzerFactory
+        from .backends import get_backend_name
+
+        AnalyzerFactory.disable_worker_pool()
+        analysis_types = self.analysis_types or list(AnalyzerFactory._analyzer_classes)
+        for analysis_type in analysis_types:
+            # Tracing runs a forward pass, which would start the OpenMP thread pool before the fork
+            if get_backend_name(analysis_type) == "traced":
+                raise ValueError(f"The traced backend can't be used with the worker pool; set {analysis_type} to fp32 or int8")
+        for analysis_type in analysis_types:
+            analyzer = AnalyzerFactory.get_analyzer(analysis_type)
+            analyzer._check_ready()
+            self.info[analysis_type] = {
+                "model_name": analyzer.model_name,
+                "revision": analyzer.revision,
+            }
+
+        self._context = multiprocessing.get_context('fork')
+        self._threads = max(1, (os.cpu_count() or 1) // self.workers)
+        for index in range(self.workers):
+            self._spawn(index)
+        threading.Thread(target=self._dispatch, name="inference-dispatch", daemon=True).start()
+        logger.info(f"Started {self.workers} inference workers with {self._threads} threads each")
+
+    def _spawn(self, index):
+        parent_end, child_end = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(child_end, self._threads),
+            name=f"inference-worker-{index}",
+            daemon=True
+        )
+        process.start()
+        # Only the child keeps its end open, so the parent sees EOF when the child exits
+        child_end.close()
+        worker = WorkerProcess(index, process, parent_end)
+        self._processes[index] = process
+        threading.Thread(target=self._watch, args=(worker,), name=f"inference-watch-{index}", daemon=True).start()
+        self._idle.put(worker)
+
+    def submit(self, analysis_type, texts):
+        if analysis_type not in self.info:
+            raise ValueError(f"Unknown analysis type: {analysis_type}")
+        future = Future()
+        task_id = next(self._task_ids)
+        with self._futures_lock:
+            self._futures[task_id] = future
+        self._tasks.put((task_id, analysis_type, list(texts)))
+        return future
+
+    def _dispatch(self):
+        """Hand each queued task to the next idle worker."""
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                return
+            while True:
+                worker = self._idle.get()
+                with worker.lock:
+                    if not worker.alive:
+                        continue
+                    worker.task_id = task[0]
+                    try:
+                        worker.connection.send(task)
+                    except (OSError, ValueError):
+                        pass  # The worker just died; _watch fails the task
+                break
+
+    def _watch(self, worker):
+        """Pass on the worker's results until it exits, then fail its task and fork a replacement."""
+        while True:
+            ready = wait([worker.connection, worker.process.sentinel])
+            if worker.connection not in ready:
+                break
+            try:
+                task_id, result = worker.connection.recv()
+            except (EOFError, OSError):
+                break
+            with worker.lock:
+                worker.task_id = None
+            self._resolve(task_id, result)
+            self._idle.put(worker)
+
+        worker.process.join()
+        with worker.lock:
+            worker.alive = False
+            task_id, worker.task_id = worker.task_id, None
+        worker.connection.close()
+        if self._closing:
+            return
+        exitcode = worker.process.exitcode
+        logger.error(f"Inference worker {worker.index} exited with code {exitcode}, starting a replacement")
+        if task_id is not None:
+            self._resolve(task_id, ("error", f"Inference worker exited with code {exitcode} while scoring the batch"))
+        self._spawn(worker.index)
+
+    def _resolve(self, task_id, result):
+        with self._futures_lock:
+            future = self._futures.pop(task_id, None)
+        if future is not None:
+            future.set_result(result)
+
+    def serve_forever(self):
+        self.start()
+        with Listener(self.address, authkey=self.authkey) as listener:
+            logger.info(f"Inference worker pool listening on {self.address}")
+            while True:
+                connection = listener.accept()
+                threading.Thread(target=self._handle_connection, args=(connection,), daemon=True).start()
+
+    def _handle_connection(self, connection):
+        with connection:
+            while True:
+                try:
+                    request = connection.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    if request[0] == "info":
+                        response = ("ok", self.info)
+                    elif request[0] == "analyze":
+                        _, analysis_type, texts = request
+                        response = self.submit(analysis_type, texts).result()
+                    else:
+                        response = ("error", f"Unknown request: {request[0]}")
+                except Exception as e:
+                    response = ("error", str(e))
+                try:
+                    connection.send(response)
+                except OSError:
+                    return  # The client gave up waiting and hung up
+
+    def shutdown(self):
+        self._closing = True
+        self._tasks.put(None)
+        while not self._idle.empty():
+            worker = self._idle.get()
+            try:
+                worker.connection.send(None)
+            except (OSError, ValueError):
+                pass
+        for process in self._processes.values():
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+
+
+class PoolAnalyzer:
+    """Analyzer stand-in that forwards batches to the inference worker pool."""
+
+    def __init__(self, analysis_type, address=None, authkey=None, timeout=None):
+        self.analysis_type = analysis_type
+        self.name = analysis_type.capitalize()
+        self.address = address or get_pool_address()
+        self.authkey = authkey or get_pool_authkey()
+        self.timeout = timeout or get_pool_timeout()
+        self._info = None
+        self._local = threading.local()
+
+    def _request(self, *request):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = Client(self.address, authkey=self.authkey)
+            self._local.connection = connection
+        try:
+            connection.send(request)
+            if not connection.poll(self.timeout):
+                raise TimeoutError(f"Inference worker pool did not answer within {self.timeout}s")
+            status, payload = connection.recv()
+        except (EOFError, OSError):
+            # Reconnect on the next call, e.g. after the pool restarted. A late answer would
+            # otherwise be read as the reply to the next request, so a timed out connection goes too.
+            self._local.connection = None
+            connection.close()
+            raise
+        if status != "ok":
+            raise RuntimeError(payload)
+        return payload
+
+    @property
+    def info(self):
+        if self._info is None:
+            self._info = self._request("info")[self.analysis_type]
+        return self._info
+
+    @property
+    def model_name(self):
+        return self.info["model_name"]
+
+    @property
+    def revision(self):
+        return self.info["revision"]
+
+    def is_ready(self):
+        try:
+            return self.info is not None
+        except Exception:
+            return False
+
+    def _check_ready(self):
+        if not self.is_ready():
+            raise RuntimeError(f"Inference worker pool at {self.address} is not available.")
+
+    def analyze(self, text):
+        return self.analyze_batch([text])[0]
+
+    def analyze_batch(self, texts, batch_size=None):
+        return [self.label_for(scores) for scores in self.score_batch(texts, batch_size=batch_size)]
+
+    def score_batch(self, texts, batch_size=None):
+        if not texts:
+            return []
+        return self._request("analyze", self.analysis_type, list(texts))
+
+    def label_for(self, scores):
+        return scores_to_label(self.analysis_type, scores)